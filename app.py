@@ -17,20 +17,35 @@ Routes:
   DELETE /api/game/<app_id>  remove a game from DB
 """
 
-import os
+import hashlib
+import json
+import multiprocessing
+import queue
+import sqlite3
 import sys
 import threading
+import uuid
+import zlib
+from collections import defaultdict
 from pathlib import Path
 
-# Load .env file if present
+# Flask
+from flask import (
+    Flask, Response, render_template, request, redirect, url_for, g, stream_with_context,
+    make_response,
+)
+
+# orjson serialises several times faster than the stdlib json module
 try:
-    from dotenv import load_dotenv
-    load_dotenv()
+    import orjson
 except ImportError:
-    pass
+    orjson = None
 
-# Flask
-from flask import Flask, render_template, jsonify, request, redirect, url_for
+# CBOR (optional) for the frontend's bulk endpoints: binary numbers, ~half the bytes
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
 
 # Add src/ to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
@@ -38,13 +53,28 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 from database import (
     init_db, get_deals_report, get_game_by_id,
     get_all_prices_for_game, get_game_price_history,
-    get_game_bundles, get_stats, get_all_games, delete_game, get_connection
+    get_game_bundles, get_stats, get_best_prices, delete_game, get_connection_ro, get_db_mtime,
+    close_connection,
 )
 from steam import sync_wishlist
-from itad import sync_prices
+from itad import sync_prices, finalize_prices
 from sync_loaded_helper import sync_loaded
+from config import get_config
+
+# Credentials from the environment / .env, read once at startup
+CONFIG = get_config()
 
 app = Flask(__name__)
+# For anything still serialised by Flask's own JSON provider (e.g. errors)
+app.json.compact = True
+app.json.sort_keys = False
+
+# Response compression for the JSON API (JSON typically shrinks 5-10x)
+COMPRESS_MIN_SIZE = 1024   # bytes; smaller bodies aren't worth the CPU
+COMPRESS_LEVEL    = 6
+COMPRESS_FLUSH_SIZE = 4096  # bytes of a streamed body buffered between flushes
+COMPRESS_MIMETYPES = {"application/json", "application/x-ndjson",
+                      "application/cbor", "application/cbor-seq"}
 
 # Sync state (simple in-memory flag for showing progress in UI)
 sync_status = {
@@ -53,39 +83,275 @@ sync_status = {
     "error": None,
     "done": False,
 }
+# sync_status pre-serialised, so /api/sync/status polling just sends bytes
+_status_bytes = json.dumps(sync_status, separators=(",", ":")).encode()
+
+# Background sync jobs keyed by UUID: {job_id: (process, progress queue)}
+_sync_jobs: dict[str, tuple] = {}
+_current_job_id = None
+_sync_lock = threading.RLock()  # Flask serves requests on several threads
 
+# Bumped whenever this process changes the data; combined with the DB file
+# mtimes so writes from the CLI (e.g. a cron sync) also invalidate the cache
+DATA_VERSION = 0
+
+# Serialised JSON bodies keyed by endpoint: {key: (version, bytes)}
+_response_cache: dict[str, tuple] = {}
+
+
+def _data_version() -> tuple:
+    return (DATA_VERSION, *get_db_mtime())
+
+
+def _bump_data_version() -> None:
+    global DATA_VERSION
+    DATA_VERSION += 1
+    _response_cache.clear()
+
+
+def run_full_sync(steam_id: str, steam_key: str, itad_key: str, progress) -> None:
+    """
+    Run the full sync in a worker process so the web server doesn't block
+    (or fight it for the GIL). Progress is reported as sync_status-shaped
+    dicts put on the `progress` queue.
+    """
+    def set_step(step: str) -> None:
+        progress.put({"running": True, "step": step, "error": None, "done": False})
 
-def run_full_sync(steam_id: str, steam_key: str, itad_key: str):
-    """Run the full sync in a background thread so the UI doesn't block."""
-    global sync_status
-    sync_status = {"running": True, "step": "Steam wishlist", "error": None, "done": False}
+    set_step("Steam wishlist")
+    itad_done = False
 
     try:
         sync_wishlist(steam_id, steam_key)
 
         if itad_key:
-            sync_status["step"] = "ITAD prices"
+            set_step("ITAD prices")
             try:
-                sync_prices(itad_key)
+                # Discounts and summaries are finalised after Loaded.com's
+                # prices are in too, as cmd_sync does
+                sync_prices(itad_key, finalize=False)
+                itad_done = True
             except Exception as itad_err:
                 # ITAD may return 403 if the app hasn't been approved yet for
                 # price endpoints. Log the warning and continue â€” the code will
                 # work automatically once ITAD grants access.
                 print(f"[ITAD] Skipped: {itad_err}")
-                sync_status["step"] = "ITAD skipped (see terminal)"
+                set_step("ITAD skipped (see terminal)")
 
         # Sync Loaded.com prices (with rate limiting to avoid blocks)
-        sync_status["step"] = "Loaded.com prices"
+        set_step("Loaded.com prices")
         try:
             sync_loaded()
         except Exception as loaded_err:
             print(f"[Loaded] Skipped: {loaded_err}")
-            sync_status["step"] = "Loaded skipped (see terminal)"
+            set_step("Loaded skipped (see terminal)")
 
-        sync_status = {"running": False, "step": "Done", "error": None, "done": True}
+        if itad_done:
+            set_step("Recalculating discounts")
+            finalize_prices()
+
+        progress.put({"running": False, "step": "Done", "error": None, "done": True})
 
     except Exception as e:
-        sync_status = {"running": False, "step": "", "error": str(e), "done": True}
+        progress.put({"running": False, "step": "", "error": str(e), "done": True})
+
+
+def _set_sync_status(status: dict) -> None:
+    """Replace sync_status and re-serialise it for the polling endpoint."""
+    global sync_status, _status_bytes
+    sync_status = status
+    _status_bytes = _dumps(status)
+
+
+def _refresh_sync_status() -> None:
+    """Pull whatever the sync worker has reported since the last call into sync_status."""
+    global _current_job_id
+
+    with _sync_lock:
+        job = _sync_jobs.get(_current_job_id)
+        if job is None:
+            return
+        process, progress = job
+
+        # Check liveness before draining so a final update isn't missed
+        alive = process.is_alive()
+        latest = None
+        try:
+            while True:
+                latest = progress.get_nowait()
+        except queue.Empty:
+            pass
+        if latest is not None:
+            _set_sync_status(latest)
+
+        if not alive and not sync_status["done"]:
+            _set_sync_status({
+                "running": False, "step": "", "done": True,
+                "error": f"Sync worker exited unexpectedly (exit code {process.exitcode})",
+            })
+
+        if sync_status["done"]:
+            process.join()
+            del _sync_jobs[_current_job_id]
+            _current_job_id = None
+            # Even a failed sync may have written some rows
+            _bump_data_version()
+
+
+def _json_default(obj):
+    """
+    Fallback encoder: sqlite3.Row rows serialise as objects, so query results
+    can be returned without copying them into dicts first; anything else
+    (e.g. datetimes) becomes a string.
+    """
+    if isinstance(obj, sqlite3.Row):
+        return dict(zip(obj.keys(), obj))
+    return str(obj)
+
+
+def _dumps(obj) -> bytes:
+    """Serialise obj to JSON bytes with orjson (stdlib json if not installed)."""
+    if orjson is None:
+        return json.dumps(obj, default=_json_default, separators=(",", ":")).encode()
+    return orjson.dumps(obj, default=_json_default)
+
+
+def ojsonify(obj, status: int = 200):
+    """Drop-in for jsonify that serialises with _dumps."""
+    return app.response_class(_dumps(obj), status=status, mimetype="application/json")
+
+
+def _cbor_default(encoder, obj):
+    """cbor2 counterpart of _json_default."""
+    if isinstance(obj, sqlite3.Row):
+        encoder.encode(dict(zip(obj.keys(), obj)))
+    else:
+        encoder.encode(str(obj))
+
+
+def _cbor_dumps(obj) -> bytes:
+    return cbor2.dumps(obj, default=_cbor_default)
+
+
+def _wants_cbor() -> bool:
+    """True if the client prefers CBOR over JSON (Accept: application/cbor) and cbor2 is installed."""
+    if cbor2 is None:
+        return False
+    best = request.accept_mimetypes.best_match(["application/json", "application/cbor"])
+    return best == "application/cbor"
+
+
+def negotiated(obj, status: int = 200):
+    """ojsonify, or a CBOR response when the client asks for it."""
+    if _wants_cbor():
+        resp = app.response_class(_cbor_dumps(obj), status=status, mimetype="application/cbor")
+    else:
+        resp = ojsonify(obj, status)
+    resp.vary.add("Accept")
+    return resp
+
+
+def get_db():
+    """
+    The request's read-only SQLite connection, reused by every query in the
+    request (writes go through the database helpers). Closed at teardown.
+    """
+    if "db" not in g:
+        g.db = get_connection_ro()
+    return g.db
+
+
+@app.teardown_appcontext
+def close_db(exc):
+    # Werkzeug's threaded server runs each request on a new thread, so a
+    # thread's cached connections (the database helpers' included) would
+    # never be reused; close them rather than leak one per request
+    g.pop("db", None)
+    close_connection()
+
+
+def _cached_json(key: str, build):
+    """Serve the cached JSON body for key until the data version changes."""
+    version = _data_version()
+    hit = _response_cache.get(key)
+    if hit and hit[0] == version:
+        return app.response_class(hit[1], mimetype="application/json")
+    resp = ojsonify(build())
+    _response_cache[key] = (version, resp.get_data())
+    return resp
+
+
+@app.after_request
+def gzip_response(resp):
+    """Gzip JSON/NDJSON API responses when the client accepts it."""
+    if (
+        resp.mimetype not in COMPRESS_MIMETYPES
+        or not 200 <= resp.status_code < 300
+        or "Content-Encoding" in resp.headers
+        or "gzip" not in request.headers.get("Accept-Encoding", "")
+    ):
+        return resp
+
+    resp.vary.add("Accept-Encoding")
+
+    if resp.is_streamed:
+        # Compress the stream chunk by chunk; wbits=31 writes a gzip header.
+        # Z_SYNC_FLUSH pushes what zlib has buffered out to the client, so
+        # NDJSON rows keep arriving as they're produced: the first row at
+        # once, then every COMPRESS_FLUSH_SIZE bytes (flushing every row
+        # would cost deflate most of its ratio on short rows)
+        compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+        chunks = resp.response
+
+        def compressed():
+            unflushed = COMPRESS_FLUSH_SIZE
+            try:
+                for chunk in chunks:
+                    data = compressor.compress(chunk)
+                    unflushed += len(chunk)
+                    if unflushed >= COMPRESS_FLUSH_SIZE:
+                        data += compressor.flush(zlib.Z_SYNC_FLUSH)
+                        unflushed = 0
+                    if data:
+                        yield data
+                yield compressor.flush()
+            finally:
+                if hasattr(chunks, "close"):
+                    chunks.close()
+
+        resp.response = compressed()
+        resp.headers.pop("Content-Length", None)
+    else:
+        body = resp.get_data()
+        if len(body) < COMPRESS_MIN_SIZE:
+            return resp
+        resp.set_data(zlib.compress(body, COMPRESS_LEVEL, wbits=31))
+
+    resp.headers["Content-Encoding"] = "gzip"
+    return resp
+
+
+def _shell_etag() -> str:
+    """Hash of the code and templates: the page shells only change when these do."""
+    root = Path(__file__).parent
+    digest = hashlib.md5()
+    for path in [root / "app.py", *sorted((root / "templates").glob("*.html"))]:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+SHELL_ETAG = _shell_etag()
+
+
+def render_cached(etag: str, template: str, **context):
+    """
+    Render a page with an ETag. The data is loaded client-side from the JSON
+    API, so a repeat visit with a matching If-None-Match gets a 304.
+    """
+    resp = make_response(render_template(template, **context))
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"  # always revalidate, never serve stale
+    return resp.make_conditional(request)
 
 
 # Page routes
@@ -93,7 +359,7 @@ def run_full_sync(steam_id: str, steam_key: str, itad_key: str):
 @app.route("/")
 def index():
     """Main dashboard â€” renders the full deals table."""
-    return render_template("index.html")
+    return render_cached(SHELL_ETAG, "index.html")
 
 
 @app.route("/game/<int:app_id>")
@@ -102,86 +368,86 @@ def game_detail(app_id: int):
     game = get_game_by_id(app_id)
     if not game:
         return redirect(url_for("index"))
-    return render_template("game.html", game=game)
+    # The page embeds the title, so include it alongside last_checked
+    etag = hashlib.md5(
+        f"{SHELL_ETAG}|{app_id}|{game['title']}|{game['last_checked']}".encode()
+    ).hexdigest()
+    return render_cached(etag, "game.html", game=game)
 
 
 @app.route("/settings")
 def settings():
     """Settings / sync page."""
-    return render_template("settings.html")
+    return render_cached(SHELL_ETAG, "settings.html")
 
 
 # API routes
 
 @app.route("/api/stats")
 def api_stats():
-    return jsonify(get_stats())
+    return _cached_json("stats", get_stats)
 
 
 @app.route("/api/games")
 def api_games():
     """
     Returns the deals report as JSON.
-    Supports ?filter=sale (only discounted) and ?min_discount=50
+    Supports ?filter=sale (only discounted), ?min_discount=50 and ?q=title search
     """
-    rows = get_deals_report()
-
-    filter_param    = request.args.get("filter")
-    min_disc        = request.args.get("min_discount", type=int)
-    search          = request.args.get("q", "").lower().strip()
-
-    if filter_param == "sale":
-        rows = [r for r in rows if (r.get("best_discount") or 0) > 0]
-
-    if min_disc:
-        rows = [r for r in rows if (r.get("best_discount") or 0) >= min_disc]
+    sale_only = request.args.get("filter") == "sale"
+    min_disc  = request.args.get("min_discount", type=int)
+    search    = request.args.get("q", "").strip()
 
-    if search:
-        rows = [r for r in rows if search in r["title"].lower()]
+    # The unfiltered report is what the dashboard asks for; cache just that
+    if not (sale_only or min_disc or search):
+        return _cached_json("games", get_deals_report)
 
-    return jsonify(rows)
+    rows = get_deals_report(sale_only=sale_only, min_discount=min_disc, search=search)
+    return ojsonify(rows)
 
 
 @app.route("/api/games/with-prices")
-def api_games_with_all_prices():
+@app.route("/api/games/with-prices.cbor", defaults={"fmt": "cbor"})
+def api_games_with_all_prices(fmt: str = None):
     """
     Returns all games with ALL their store prices (not just best).
     Used by the frontend to recalculate best price when stores are excluded.
-    
-    Response format:
-    [
-      {
-        app_id, title, steam_url, header_image, last_checked,
-        prices: [{store, price_current, price_regular, discount_pct, url, currency}, ...],
-        historic_low, historic_low_store, num_bundles
-      },
+
+    Streamed as NDJSON (one game object per line) so the first games reach
+    the browser before the last ones are built:
+      {app_id, title, steam_url, header_image, last_checked,
+       prices: [{store, price_current, price_regular, discount_pct, url, currency}, ...],
+       historic_low, historic_low_store, num_bundles}
       ...
-    ]
+
+    With Accept: application/cbor (or via the .cbor URL) the same objects
+    are sent as a CBOR sequence instead, one CBOR item per game.
     """
-    from database import get_all_prices_for_game
-    
-    games = get_all_games()
-    result = []
-    
-    for game in games:
-        try:
-            # Get all prices for this game (excluding historic low metadata entries)
-            all_prices = get_all_prices_for_game(game["app_id"])
-            prices = [p for p in all_prices if not p["store"].startswith("Historic Low")]
-            
-            # Calculate historic low from the historic_lows table (from ITAD)
-            conn = get_connection()
-            historic_row = conn.execute(
-                "SELECT MIN(price) as low_price, store FROM historic_lows WHERE app_id = ? GROUP BY app_id ORDER BY low_price ASC LIMIT 1",
-                (game["app_id"],)
-            ).fetchone()
-            historic_low = historic_row[0] if historic_row else None
-            historic_low_store = historic_row[1] if historic_row else None
-            conn.close()
-            
-            # Count bundles
-            bundles = get_game_bundles(game["app_id"])
-            
+    if fmt == "cbor" and cbor2 is None:
+        return ojsonify({"error": "CBOR support not installed (pip install cbor2)"}, 406)
+    use_cbor = fmt == "cbor" or _wants_cbor()
+    encode = _cbor_dumps if use_cbor else (lambda obj: _dumps(obj) + b"\n")
+
+    conn = get_db()
+
+    # One bulk prices query instead of one per game (N+1); bundle counts and
+    # historic lows are precomputed onto games by refresh_game_summaries()
+    prices_by_app = defaultdict(list)
+    for row in conn.execute("""
+        SELECT app_id, store, price_current, price_regular, currency, discount_pct, url, drm, fetched_at
+        FROM prices
+        WHERE store NOT LIKE 'Historic Low%'
+        ORDER BY app_id, price_current ASC
+    """):
+        price = dict(row)
+        prices_by_app[price.pop("app_id")].append(price)
+
+    def generate():
+        for game in conn.execute("SELECT * FROM games ORDER BY title"):
+            app_id = game["app_id"]
+            prices = prices_by_app.get(app_id, [])
+            historic_low = game["historic_low"]
+
             # If no current prices exist but we have a historic low,
             # add it as a synthetic "reference only" price so the game shows up
             if not prices and historic_low is not None:
@@ -193,34 +459,35 @@ def api_games_with_all_prices():
                     "discount_pct": 0,
                     "url": None,
                 }]
-            
-            result.append({
-                "app_id": game["app_id"],
+
+            yield encode({
+                "app_id": app_id,
                 "title": game["title"],
                 "steam_url": game["steam_url"],
                 "header_image": game["header_image"],
                 "last_checked": game["last_checked"],
                 "prices": prices,
                 "historic_low": historic_low,
-                "historic_low_store": historic_low_store,
-                "num_bundles": len(bundles),
+                "historic_low_store": game["historic_low_store"],
+                "num_bundles": game["num_bundles"] or 0,
             })
-        except Exception as e:
-            print(f"[API] Error processing game {game.get('app_id')}: {e}")
-            # Still add the game but with empty prices
-            result.append({
-                "app_id": game["app_id"],
-                "title": game["title"],
-                "steam_url": game.get("steam_url"),
-                "header_image": game.get("header_image"),
-                "last_checked": game.get("last_checked"),
-                "prices": [],
-                "historic_low": None,
-                "historic_low_store": None,
-                "num_bundles": 0,
-            })
-    
-    return jsonify(result)
+
+    mimetype = "application/cbor-seq" if use_cbor else "application/x-ndjson"
+    resp = Response(stream_with_context(generate()), mimetype=mimetype)
+    resp.vary.add("Accept")
+    return resp
+
+
+@app.route("/api/games/best")
+def api_games_best():
+    """
+    Best current price per game with some stores excluded, computed in SQL.
+    ?exclude=Store1,Store2  ->  {app_id: {store, price_current, discount_pct}}
+    """
+    exclude = [s.strip() for s in request.args.get("exclude", "").split(",") if s.strip()]
+    best = get_best_prices(exclude)
+    # JSON object keys must be strings
+    return ojsonify({str(app_id): price for app_id, price in best.items()})
 
 
 @app.route("/api/game/<int:app_id>")
@@ -228,14 +495,14 @@ def api_game_detail(app_id: int):
     """Full detail for one game: metadata + all prices + history + bundles."""
     game    = get_game_by_id(app_id)
     if not game:
-        return jsonify({"error": "Not found"}), 404
+        return ojsonify({"error": "Not found"}, 404)
 
     prices  = get_all_prices_for_game(app_id)
     history = get_game_price_history(app_id)
     bundles = get_game_bundles(app_id)
 
-    return jsonify({
-        "game":    dict(game),
+    return negotiated({
+        "game":    game,
         "prices":  prices,
         "history": history,
         "bundles": bundles,
@@ -244,7 +511,8 @@ def api_game_detail(app_id: int):
 
 @app.route("/api/sync/status")
 def api_sync_status():
-    return jsonify(sync_status)
+    _refresh_sync_status()
+    return app.response_class(_status_bytes, mimetype="application/json")
 
 
 @app.route("/api/sync/full", methods=["POST"])
@@ -252,48 +520,49 @@ def api_sync_full():
     """
     Trigger a full sync. Accepts JSON body:
       { steam_id, steam_key, itad_key }
-    Runs in a background thread â€” poll /api/sync/status for progress.
+    Runs in a worker process â€” poll /api/sync/status for progress.
     """
-    global sync_status
-
-    if sync_status.get("running"):
-        return jsonify({"error": "Sync already running"}), 409
+    global _current_job_id
 
     data        = request.get_json() or {}
-    steam_id    = data.get("steam_id")    or os.getenv("STEAM_ID", "")
-    steam_key   = data.get("steam_key")   or os.getenv("STEAM_API_KEY", "")
-    itad_key    = data.get("itad_key")    or os.getenv("ITAD_API_KEY", "")
+    steam_id    = data.get("steam_id")    or CONFIG.steam_id
+    steam_key   = data.get("steam_key")   or CONFIG.steam_key
+    itad_key    = data.get("itad_key")    or CONFIG.itad_key
 
     if not steam_id or not steam_key:
-        return jsonify({"error": "steam_id and steam_key are required"}), 400
+        return ojsonify({"error": "steam_id and steam_key are required"}, 400)
 
-    thread = threading.Thread(
-        target=run_full_sync,
-        args=(steam_id, steam_key, itad_key),
-        daemon=True,
-    )
-    thread.start()
+    with _sync_lock:
+        _refresh_sync_status()
+        if _current_job_id is not None:
+            return ojsonify({"error": "Sync already running"}, 409)
 
-    return jsonify({"ok": True, "message": "Sync started"})
+        progress = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=run_full_sync,
+            args=(steam_id, steam_key, itad_key, progress),
+            daemon=True,
+        )
+        process.start()
+
+        job_id = str(uuid.uuid4())
+        _sync_jobs[job_id] = (process, progress)
+        _current_job_id = job_id
+        _set_sync_status({"running": True, "step": "Starting", "error": None, "done": False})
+
+    return ojsonify({"ok": True, "message": "Sync started", "job_id": job_id})
 
 
 @app.route("/api/game/<int:app_id>", methods=["DELETE"])
 def api_delete_game(app_id: int):
     """Remove a game from the DB (and all its prices/bundles)."""
     delete_game(app_id)
-    return jsonify({"ok": True})
+    _bump_data_version()
+    return ojsonify({"ok": True})
 
 
 # Template filters
 
-@app.template_filter("gbp")
-def fmt_gbp(value):
-    """Format a float as GBP: Â£14.99"""
-    if value is None:
-        return "N/A"
-    return f"Â£{value:,.2f}"
-
-
 @app.template_filter("short_date")
 def short_date(value):
     """Trim ISO datetime to YYYY-MM-DD."""
@@ -13,34 +13,31 @@ No external frameworks needed.
 """
 
 import argparse
-import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 
-# Load environment variables from .env file if it exists
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    # python-dotenv not installed, fall back to system env vars only
-    pass
-
 # Add src/ to the Python path so we can import our modules
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from src.database import (
+from database import (
     init_db,
-    get_all_games,
-    get_deals_report,
+    get_all_games_sorted,
+    get_game_by_id,
+    get_game_by_title,
+    search_games,
+    get_report_rows,
     get_game_price_history,
     get_game_bundles,
     get_stats,
     delete_game,
     clear_database,
+    close_connection,
 )
-from steam import sync_wishlist
-from itad import sync_prices
-from sync_loaded_helper import sync_loaded
+from config import get_config
+# steam / itad / sync_loaded_helper (requests, bs4) are imported inside
+# cmd_sync so the offline commands don't pay for them
 
 
 # ANSI colour codes for terminal output
@@ -62,11 +59,25 @@ COL_DISC    = 6
 COL_HIST    = 12
 COL_BUNDLES = 8
 
+# Output fragments that never change, built once instead of once per row
+REPORT_ROW    = "  {title:<45} {store:<20} {price:>10} {disc:>5}  {low:>10}"
+PRICE_NA      = f"{DIM}N/A{RESET}"
+DISC_ZERO     = f"{DIM}  0%{RESET}"
+HIST_LOW_TAG  = f" {GREEN}HISTORIC LOW{RESET}"
+NEAR_LOW_TAG  = f" {YELLOW}near low{RESET}"
+
+# Anything that isn't GBP is shown in dollars
+CURRENCY_SYMBOLS = {"GBP": "Â£"}
+
 
+@lru_cache(maxsize=128)
 def colour_discount(pct: int) -> str:
-    """Colour-code a discount percentage: green=great, yellow=ok, dim=none."""
+    """
+    Colour-code a discount percentage: green=great, yellow=ok, dim=none.
+    Cached: there are only ~100 possible percentages.
+    """
     if pct is None or pct == 0:
-        return f"{DIM}  0%{RESET}"
+        return DISC_ZERO
     elif pct >= 75:
         return f"{GREEN}{BOLD}{pct:3d}%{RESET}"
     elif pct >= 40:
@@ -85,30 +96,55 @@ def colour_vs_historic(current: float, historic: float) -> str:
 
     ratio = current / historic  # 1.0 = at historic low, 2.0 = double the low
     if ratio <= 1.05:
-        return f" {GREEN}HISTORIC LOW{RESET}"
+        return HIST_LOW_TAG
     elif ratio <= 1.25:
-        return f" {YELLOW}near low{RESET}"
+        return NEAR_LOW_TAG
     else:
-        pct_above = int((ratio - 1) * 100)
-        return f" {DIM}+{pct_above}% above low{RESET}"
+        return _above_low_tag(int((ratio - 1) * 100))
+
+
+@lru_cache(maxsize=256)
+def _above_low_tag(pct_above: int) -> str:
+    return f" {DIM}+{pct_above}% above low{RESET}"
 
 
 def fmt_price(price, currency="GBP") -> str:
     """Format a price for display. Handles None gracefully."""
     if price is None:
-        return f"{DIM}N/A{RESET}"
-    symbol = "Â£" if currency == "GBP" else "$"
-    return f"{symbol}{price:,.2f}"
+        return PRICE_NA
+    return f"{CURRENCY_SYMBOLS.get(currency, '$')}{price:,.2f}"
+
+
+def write_lines(lines: list[str]) -> None:
+    """
+    Write a block of output lines at once. The text is encoded in one go and
+    sent straight to the binary stdout buffer, skipping the text layer's
+    per-write work.
+    """
+    text = "\n".join(lines) + "\n"
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        # stdout replaced by something text-only (e.g. StringIO)
+        sys.stdout.write(text)
+        return
+    sys.stdout.flush()  # anything already print()ed must come first
+    buffer.write(text.encode(sys.stdout.encoding or "utf-8", errors="replace"))
+    buffer.flush()
 
 
 def cmd_sync(args) -> None:
     """
-    Full sync: Steam wishlist ITAD prices.
-    Reads credentials from args or falls back to environment variables.
+    Full sync: Steam wishlist, then ITAD + Loaded.com prices concurrently.
+    Reads credentials from args or falls back to environment variables / .env.
     """
-    steam_id  = args.steam_id  or os.getenv("STEAM_ID")
-    steam_key = args.steam_key or os.getenv("STEAM_API_KEY")
-    itad_key  = args.itad_key  or os.getenv("ITAD_API_KEY")
+    from steam import sync_wishlist
+    from itad import sync_prices, finalize_prices
+    from sync_loaded_helper import sync_loaded
+
+    config    = get_config()
+    steam_id  = args.steam_id  or config.steam_id
+    steam_key = args.steam_key or config.steam_key
+    itad_key  = args.itad_key  or config.itad_key
 
     if not steam_id or not steam_key:
         print(f"{RED}Error:{RESET} Steam ID and Steam API key are required.")
@@ -119,25 +155,45 @@ def cmd_sync(args) -> None:
 
     print(f"\n{BOLD}{CYAN}Steam Wishlist Tracker{RESET}\n")
 
-    # Step 1: Steam wishlist
+    # Step 1: Steam wishlist (everything else reads the games it writes)
     print(f"{BOLD}[1/2] Syncing Steam wishlist...{RESET}")
     sync_wishlist(steam_id, steam_key)
 
-    # Step 2: ITAD prices
+    # Step 2: ITAD and Loaded.com don't depend on each other, so fetch both at once
+    stages = {}
     if itad_key:
-        print(f"\n{BOLD}[2/2] Fetching ITAD prices...{RESET}")
-        sync_prices(itad_key)  # Removed country parameter
+        # Discounts and summaries are finalised below, once Loaded.com's
+        # prices are in too, rather than whenever ITAD happens to finish
+        stages["ITAD"] = lambda: sync_prices(itad_key, finalize=False)
     else:
-        print(f"\n{YELLOW}[2/2] Skipping ITAD (no --itad-key provided){RESET}")
+        print(f"\n{YELLOW}Skipping ITAD (no --itad-key provided){RESET}")
         print("      Get a free key at https://isthereanydeal.com/dev/app/")
-
-    # Step 3: Loaded.com prices
-    print(f"\n{BOLD}[3/3] Syncing Loaded.com prices (this will take a few minutes)...{RESET}")
-    try:
-        sync_loaded()
-    except Exception as loaded_err:
-        print(f"{YELLOW}Warning: Loaded.com sync failed{RESET}")
-        print(f"      {loaded_err}")
+    stages["Loaded.com"] = sync_loaded
+
+    print(f"\n{BOLD}[2/2] Fetching {' + '.join(stages)} prices (Loaded.com takes a few minutes)...{RESET}")
+    def run_stage(fn) -> None:
+        try:
+            fn()
+        finally:
+            # Each worker thread has its own cached connections; close them
+            # (running PRAGMA optimize) before the thread is done
+            close_connection()
+
+    with ThreadPoolExecutor(max_workers=len(stages)) as pool:
+        futures = {pool.submit(run_stage, fn): name for name, fn in stages.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                future.result()
+                print(f"{GREEN}{name} prices done.{RESET}")
+            except Exception as err:
+                if name == "ITAD":
+                    raise
+                print(f"{YELLOW}Warning: {name} sync failed{RESET}")
+                print(f"      {err}")
+
+    if "ITAD" in stages:
+        finalize_prices()
 
     print(f"\n{GREEN}“ Sync complete!{RESET} Run `python main.py report` to see deals.\n")
 
@@ -147,65 +203,60 @@ def cmd_report(args) -> None:
     Print the deals report a formatted table of all wishlist games
     sorted by best current deal.
     """
-    rows = get_deals_report()
+    # Filtering and sorting happen in SQL; only matching rows come back
+    rows = get_report_rows(sale_only=args.on_sale, min_discount=args.min_discount)
 
     if not rows:
-        print(f"\n{YELLOW}No data yet.{RESET} Run `python main.py sync` first.\n")
+        if (args.on_sale or args.min_discount) and get_stats()["games_with_prices"]:
+            print(f"\n{YELLOW}No games match your filters.{RESET}\n")
+        else:
+            print(f"\n{YELLOW}No data yet.{RESET} Run `python main.py sync` first.\n")
         return
 
-    # Filter: only show games currently on sale, if requested
-    if args.on_sale:
-        rows = [r for r in rows if r.get("best_discount", 0) and r["best_discount"] > 0]
-
-    # Filter: minimum discount threshold
-    if args.min_discount:
-        rows = [r for r in rows if (r.get("best_discount") or 0) >= args.min_discount]
-
-    if not rows:
-        print(f"\n{YELLOW}No games match your filters.{RESET}\n")
-        return
-
-    print(f"\n{BOLD}{CYAN}Wishlist Deals Report{RESET}")
-    print(f"{DIM}{len(rows)} games | sorted by discount then price{RESET}\n")
-
-    # Table header
-    print(f"  {'GAME':<45} {'STORE':<20} {'PRICE':>10} {'DISC':>6} {'LOW':>10}")
-
-    for r in rows:
-        title = r["title"][:44] if r["title"] else "Unknown"
-        store = r["best_store"][:19] if r.get("best_store") else "N/A"
-        price = fmt_price(r["best_price"], r["currency"]) if r.get("best_price") else "N/A"
-        disc  = f"{r['best_discount']}%" if r.get("best_discount") else "â€”"
-        low   = fmt_price(r["historic_low"], r["currency"]) if r.get("historic_low") else "â€”"
-
-        print(f"  {title:<45} {store:<20} {price:>10} {disc:>5}  {low:>10}")
+    # Build the whole table, then write it in one go (one write instead of one per row)
+    lines = [
+        f"\n{BOLD}{CYAN}Wishlist Deals Report{RESET}",
+        f"{DIM}{len(rows)} games | sorted by discount then price{RESET}\n",
+        # Table header
+        f"  {'GAME':<45} {'STORE':<20} {'PRICE':>10} {'DISC':>6} {'LOW':>10}",
+    ]
+
+    # get_report_rows() yields flat tuples with defaults already applied in SQL.
+    # The summary count is tallied in the same pass.
+    on_sale_count = 0
+    for title, store, price, disc, hist, currency in rows:
+        if disc > 0:
+            on_sale_count += 1
+        title = title[:44] if title else "Unknown"
+        store = store[:19] if store else "N/A"
+        price = fmt_price(price, currency) if price else "N/A"
+        disc  = f"{disc}%" if disc else "â€”"
+        low   = fmt_price(hist, currency) if hist else "â€”"
+
+        lines.append(REPORT_ROW.format(title=title, store=store, price=price, disc=disc, low=low))
 
     # Summary footer
     stats = get_stats()
-    on_sale_count = sum(1 for r in rows if r.get("best_discount", 0) and r["best_discount"] > 0)
-    print(f"{DIM}Summary: {on_sale_count}/{len(rows)} games on sale | {stats['total_bundles']} bundles tracked{RESET}")
-    print()
+    lines.append(f"{DIM}Summary: {on_sale_count}/{len(rows)} games on sale | {stats['total_bundles']} bundles tracked{RESET}")
+    lines.append("")
+    write_lines(lines)
 
 
 def cmd_game(args) -> None:
     """Detailed view for a single game: price history + bundles.
     Accepts either Steam App ID (numeric) or game name (partial match, case-insensitive).
     """
-    games = get_all_games()
-    if not games:
-        print(f"\n{YELLOW}No games in database.{RESET} Run `python main.py sync` first.\n")
-        sys.exit(1)
-    
     game = None
 
     # Check if input is numeric (App ID)
     try:
         app_id = int(args.game_id)
-        game = next((g for g in games if g["app_id"] == app_id), None)
+        game = get_game_by_id(app_id)
     except ValueError:
-        # Not a number, search by game name (case-insensitive, partial match)
-        search_term = str(args.game_id).lower()
-        matches = [g for g in games if search_term in g["title"].lower()]
+        # Not a number: an exact title wins (so "Portal" isn't ambiguous with
+        # "Portal 2"), otherwise search by name (case-insensitive, partial match)
+        game = get_game_by_title(args.game_id)
+        matches = [game] if game else search_games(args.game_id)
         
         if len(matches) == 1:
             game = matches[0]
@@ -218,6 +269,10 @@ def cmd_game(args) -> None:
             print(f"\n{DIM}Be more specific or use the App ID.{RESET}\n")
             sys.exit(1)
 
+    if not game and not get_stats()["total_games"]:
+        print(f"\n{YELLOW}No games in database.{RESET} Run `python main.py sync` first.\n")
+        sys.exit(1)
+
     if not game:
         print(f"\n{RED}Game '{args.game_id}' not found in database.{RESET}")
         print("Run `python main.py sync` first, or check the App ID / game name.\n")
@@ -233,14 +288,15 @@ def cmd_game(args) -> None:
     history = get_game_price_history(app_id)
     if history:
         print(f"{BOLD}Price History ({len(history)} records):{RESET}")
-        print(f"  {'DATE':<20} {'STORE':<20} {'PRICE':>10} {'DISC':>5}")
+        lines = [f"  {'DATE':<20} {'STORE':<20} {'PRICE':>10} {'DISC':>5}"]
         for h in history[-20:]:  # show last 20 entries
-            print(
+            lines.append(
                 f"  {h['recorded_at'][:16]:<20} "
                 f"{h['store'][:19]:<20} "
                 f"{fmt_price(h['price'], h['currency']):>10} "
                 f"{h['discount_pct']:>4}%"
             )
+        write_lines(lines)
         if len(history) > 20:
             print(f"  {DIM}... and {len(history) - 20} older entries{RESET}")
     else:
@@ -264,22 +320,22 @@ def cmd_game(args) -> None:
 
 def cmd_list(args) -> None:
     """List all games in the database (quick overview)."""
-    games = get_all_games()
+    games = get_all_games_sorted()
     if not games:
         print(f"\n{YELLOW}Database is empty.{RESET} Run `python main.py sync` first.\n")
         return
-    print(f"\n{BOLD}{CYAN}Wishlist Games ({len(games)} total){RESET}\n")
+    lines = [f"\n{BOLD}{CYAN}Wishlist Games ({len(games)} total){RESET}\n"]
     for g in games:
-        checked = g.get("last_checked", "never checked")[:16] if g.get("last_checked") else "never checked"
-        print(f"  {g['app_id']:>10}  {g['title']:<45} {DIM}{checked}{RESET}")
-    print()
+        checked = g["last_checked"][:16] if g["last_checked"] else "never checked"
+        lines.append(f"  {g['app_id']:>10}  {g['title']:<45} {DIM}{checked}{RESET}")
+    lines.append("")
+    write_lines(lines)
 
 
 def cmd_clear(args) -> None:
     """Clear all data from database and reinitialize."""
     confirm = input(f"{RED} This will delete ALL data. Type 'yes' to confirm: {RESET}")
     if confirm.lower() == "yes":
-        from src.database import clear_database
         clear_database()
         print(f"{GREEN} Database cleared and reinitialized.{RESET}\n")
     else:
@@ -289,9 +345,6 @@ def cmd_clear(args) -> None:
 # CLI setup
 
 def main():
-    # init_db() is safe to call every run creates tables only if missing
-    init_db()
-
     parser = argparse.ArgumentParser(
         prog="wishlist-tracker",
         description="Steam Wishlist Price Tracker â€” compare prices across stores",
@@ -312,7 +365,7 @@ Environment variables (alternative to flags):
         """
     )
 
-    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+    subparsers = parser.add_subparsers(dest="command", required=True, help="Command to run")
 
     # sync subcommand
     sync_p = subparsers.add_parser("sync", help="Sync wishlist and fetch prices")
@@ -342,13 +395,16 @@ Environment variables (alternative to flags):
     clear_p = subparsers.add_parser("clear", help="Clear all database data")
     clear_p.set_defaults(func=cmd_clear)
 
+    # argparse exits on --help / a missing or bad command before the DB is touched
     args = parser.parse_args()
 
-    if not args.command:
-        parser.print_help()
-        sys.exit(0)
+    # init_db() is safe to call every run creates tables only if missing
+    init_db()
 
-    args.func(args)
+    try:
+        args.func(args)
+    finally:
+        close_connection()
 
 
 if __name__ == "__main__":
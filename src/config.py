@@ -0,0 +1,37 @@
+"""
+config.py
+---------
+Credentials read from the environment (or a .env file) once per process.
+
+  STEAM_ID          Your SteamID64
+  STEAM_API_KEY     From https://steamcommunity.com/dev/apikey
+  ITAD_API_KEY      From https://isthereanydeal.com/apps/my/
+"""
+
+import os
+from dataclasses import dataclass
+from functools import cache
+
+
+@dataclass(frozen=True)
+class Config:
+    steam_id: str
+    steam_key: str
+    itad_key: str
+
+
+@cache
+def get_config() -> Config:
+    """Load .env (if python-dotenv is installed) and snapshot the credentials."""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        # python-dotenv not installed, fall back to system env vars only
+        pass
+
+    return Config(
+        steam_id=os.getenv("STEAM_ID", ""),
+        steam_key=os.getenv("STEAM_API_KEY", ""),
+        itad_key=os.getenv("ITAD_API_KEY", ""),
+    )
@@ -7,29 +7,171 @@ All prices stored and displayed in GBP (£).
 Tables:
   games         wishlist items from Steam
   prices        latest price per game per store
-  price_history full append-only price log (for historic lows)
+  price_history price log (for historic lows), compacted to one row a day
   bundles       bundle appearances (Humble, Fanatical, etc.)
 """
 
-from datetime import datetime, timezone
 import sqlite3
 import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 DB_PATH = Path(__file__).parent.parent / "data" / "wishlist.db"
 
+# UTC ISO-8601 timestamp (e.g. 2024-05-01T12:34:56.789Z), computed by SQLite
+# as rows are written instead of formatted in Python for each one
+_NOW = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+# ...and the same format from a Julian day number (how price_history stores them)
+_ISO_FROM_JULIAN = "strftime('%Y-%m-%dT%H:%M:%fZ', {})"
 
-def get_connection() -> sqlite3.Connection:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+
+# Connections are cached per thread (a sqlite3 connection mustn't be shared
+# between threads) and reused, instead of opened and closed on every call
+_local = threading.local()
+
+
+# isolation_level=None: the sqlite3 module doesn't open transactions behind
+# our back; writes are grouped explicitly with transaction(). The statement
+# cache is widened from 128 so the report/filter variants don't evict the
+# per-row write statements.
+_CONNECT_ARGS = {"isolation_level": None, "cached_statements": 512}
+
+
+def _connect(read_only: bool = False) -> sqlite3.Connection:
+    if read_only:
+        conn = sqlite3.connect(f"{DB_PATH.resolve().as_uri()}?mode=ro", uri=True, **_CONNECT_ARGS)
+    else:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, **_CONNECT_ARGS)
+        conn.execute("PRAGMA foreign_keys = ON")
+        # NORMAL is safe under WAL and avoids an fsync on every commit
+        conn.execute("PRAGMA synchronous = NORMAL")
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
+    # SQLite's lower()/LIKE/NOCASE only fold ASCII letters; this is Python's
+    # str.lower for title matches with accented letters ("CAFÉ" vs "Café")
+    conn.create_function("py_lower", 1, str.lower, deterministic=True)
+    # Wait for the sync thread's write lock instead of failing with "database is locked"
+    conn.execute("PRAGMA busy_timeout = 5000")
+    # Bigger page cache (64 MB), memory-mapped reads and in-memory temp
+    # tables for the report sorts; all per-connection settings
+    conn.execute("PRAGMA cache_size = -64000")
+    conn.execute("PRAGMA mmap_size = 30000000")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+def _thread_connection(name: str, read_only: bool) -> sqlite3.Connection:
+    """This thread's cached connection under name, (re)opened as needed."""
+    conn, pid = getattr(_local, name, (None, None))
+    if conn is None or pid != os.getpid():
+        conn = _connect(read_only)
+        setattr(_local, name, (conn, os.getpid()))
     return conn
 
 
+def get_connection() -> sqlite3.Connection:
+    """
+    This thread's shared connection, opened on first use. Callers write
+    inside transaction() and don't close it. A forked process (the web
+    sync worker) opens its own rather than reuse the parent's.
+    """
+    return _thread_connection("conn", read_only=False)
+
+
+def get_connection_ro() -> sqlite3.Connection:
+    """
+    This thread's read-only connection, used by the get_* readers. Being
+    separate from the write connection, under WAL a long report read runs
+    alongside a sync's writes instead of queueing behind them. It sees
+    committed data only, not writes still pending in a transaction().
+    """
+    return _thread_connection("ro_conn", read_only=True)
+
+
+def close_connection() -> None:
+    """
+    Close this thread's cached connections; the next get_connection() reopens.
+    Lets SQLite refresh any planner statistics its queries showed were stale
+    first (cheap: analysis is capped at 400 rows per index).
+    """
+    for name in ("ro_conn", "conn"):
+        conn, pid = getattr(_local, name, (None, None))
+        if conn is not None and pid == os.getpid():
+            if name == "conn":
+                conn.execute("PRAGMA analysis_limit = 400")
+                conn.execute("PRAGMA optimize")
+            conn.close()
+        setattr(_local, name, (None, None))
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """
+    Run the writes in the block as one transaction on this thread's
+    connection: committed once at the end (one fsync), rolled back if
+    anything raises. Every write helper below opens one of these, so a
+    caller can wrap a whole sync loop and the helpers join it instead of
+    committing per call. Nested blocks become savepoints, so a failure
+    inside one only undoes that block's writes.
+    """
+    conn = get_connection()
+    depth = getattr(_local, "tx_depth", 0)
+    savepoint = f"tx_{depth}"
+    # IMMEDIATE takes the write lock up front, so a concurrent writer waits
+    # on busy_timeout here rather than failing partway through the block
+    conn.execute(f"SAVEPOINT {savepoint}" if depth else "BEGIN IMMEDIATE")
+    _local.tx_depth = depth + 1
+    try:
+        yield conn
+    except BaseException:
+        if depth:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+        else:
+            conn.rollback()
+        raise
+    else:
+        if depth:
+            conn.execute(f"RELEASE {savepoint}")
+        else:
+            conn.commit()
+    finally:
+        _local.tx_depth = depth
+
+
+def get_db_mtime() -> tuple:
+    """
+    Modification times of the DB file and its WAL journal.
+    Changes whenever any process (web sync or CLI) writes to the database.
+    """
+    mtimes = []
+    for path in (DB_PATH, DB_PATH.with_name(DB_PATH.name + "-wal")):
+        try:
+            mtimes.append(path.stat().st_mtime_ns)
+        except FileNotFoundError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
 def init_db() -> None:
     """Create all tables if they don't already exist. Safe to call on every startup."""
     conn = get_connection()
+
+    # Lets compact_price_history() return freed pages to the filesystem.
+    # Only takes effect on a new database (before any table is created)
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+    # WAL lets dashboard reads run while a sync is writing (persists in the DB file)
+    conn.execute("PRAGMA journal_mode = WAL")
+
+    _retire_old_tables(conn)
+
+    had_id_cache = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'itad_ids'"
+    ).fetchone()
+
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS games (
             app_id          INTEGER PRIMARY KEY,
@@ -38,12 +180,17 @@ def init_db() -> None:
             steam_url       TEXT,
             header_image    TEXT,
             itad_slug       TEXT,
-            last_checked    TEXT
+            last_checked    TEXT,
+            -- Summaries of bundles/historic_lows, refreshed after each ITAD sync
+            num_bundles         INTEGER DEFAULT 0,
+            historic_low        REAL,
+            historic_low_store  TEXT
         );
 
-        -- One row per game+store, overwritten each sync
+        -- One row per game+store, overwritten each sync. Stored clustered
+        -- on (app_id, store): no separate rowid B-tree, and a game's prices
+        -- sit together on the same pages
         CREATE TABLE IF NOT EXISTS prices (
-            id              INTEGER PRIMARY KEY AUTOINCREMENT,
             app_id          INTEGER NOT NULL REFERENCES games(app_id) ON DELETE CASCADE,
             store           TEXT    NOT NULL,
             price_current   REAL,
@@ -53,10 +200,11 @@ def init_db() -> None:
             url             TEXT,
             drm             TEXT,
             fetched_at      TEXT    DEFAULT (datetime('now')),
-            UNIQUE(app_id, store)
-        );
+            PRIMARY KEY (app_id, store)
+        ) WITHOUT ROWID;
 
-        -- Append-only log never deleted, used for historic low calculation
+        -- Price log, used for historic low calculation; thinned to
+        -- one row per game, store and day by compact_price_history()
         CREATE TABLE IF NOT EXISTS price_history (
             id              INTEGER PRIMARY KEY AUTOINCREMENT,
             app_id          INTEGER NOT NULL REFERENCES games(app_id) ON DELETE CASCADE,
@@ -64,7 +212,27 @@ def init_db() -> None:
             price           REAL    NOT NULL,
             currency        TEXT    DEFAULT 'GBP',
             discount_pct    INTEGER DEFAULT 0,
-            recorded_at     TEXT    DEFAULT (datetime('now'))
+            -- Julian day number: 8 bytes a row instead of an ISO string;
+            -- readers format it with _ISO_FROM_JULIAN
+            recorded_at     REAL    DEFAULT (julianday('now'))
+        );
+
+        -- Every Steam app ID -> ITAD ID lookup ever made ('' = ITAD doesn't
+        -- have the game, re-asked once looked_up_at is old enough). No
+        -- foreign key, and clear_database() keeps the real IDs, so a wiped
+        -- or re-added game gets its ID back without another lookup request
+        CREATE TABLE IF NOT EXISTS itad_ids (
+            app_id          INTEGER PRIMARY KEY,
+            itad_id         TEXT    NOT NULL,
+            looked_up_at    REAL    DEFAULT (julianday('now'))
+        );
+
+        -- Games a full Loaded.com search (URL guess, wildcards, site search)
+        -- last failed to find, and when; sync_loaded() only re-checks the
+        -- guessed URL for these until the entry is a day old
+        CREATE TABLE IF NOT EXISTS loaded_misses (
+            app_id          INTEGER PRIMARY KEY REFERENCES games(app_id) ON DELETE CASCADE,
+            missed_at       REAL    DEFAULT (julianday('now'))
         );
 
         CREATE TABLE IF NOT EXISTS bundles (
@@ -79,15 +247,30 @@ def init_db() -> None:
             discovered_at   TEXT    DEFAULT (datetime('now'))
         );
 
-        CREATE INDEX IF NOT EXISTS idx_prices_app    ON prices(app_id);
         CREATE INDEX IF NOT EXISTS idx_history_app   ON price_history(app_id);
+        -- Groups history by game and store in timestamp order for compaction
+        CREATE INDEX IF NOT EXISTS idx_history_app_store_date
+            ON price_history(app_id, store, recorded_at);
         CREATE INDEX IF NOT EXISTS idx_bundles_app   ON bundles(app_id);
+        -- Matches the report's PARTITION BY app_id ORDER BY discount_pct DESC, price_current
+        -- so the best-deal window needs no sort
+        CREATE INDEX IF NOT EXISTS idx_prices_app_disc_price
+            ON prices(app_id, discount_pct DESC, price_current);
+        -- Serves the dashboard's ORDER BY title without a sort step
+        CREATE INDEX IF NOT EXISTS idx_games_title   ON games(title);
+        -- Case-insensitive exact title lookups (CLI `game <name>`)
+        CREATE INDEX IF NOT EXISTS idx_games_title_nocase ON games(title COLLATE NOCASE);
+        -- Real store prices only, already in the order the bulk endpoint reads them
+        CREATE INDEX IF NOT EXISTS idx_prices_app_current
+            ON prices(app_id, price_current) WHERE store NOT LIKE 'Historic Low%';
+        -- Discounted prices only: "on sale" counts read just these entries
+        CREATE INDEX IF NOT EXISTS idx_prices_onsale
+            ON prices(app_id) WHERE discount_pct > 0;
     """)
 
     # Historic lows table tracks all-time lowest prices
     conn.execute("""
         CREATE TABLE IF NOT EXISTS historic_lows (
-            id INTEGER PRIMARY KEY,
             app_id INTEGER NOT NULL,
             store TEXT NOT NULL,
             price REAL NOT NULL,
@@ -95,70 +278,343 @@ def init_db() -> None:
             discount_pct INTEGER DEFAULT 0,
             recorded_at TEXT,
             fetched_at TEXT,
-            UNIQUE(app_id, store)
+            PRIMARY KEY (app_id, store)
+        ) WITHOUT ROWID
+    """)
+    _restore_old_tables(conn)
+    # Covers MIN(price) per game without touching the table
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_hl_app_price ON historic_lows(app_id, price)")
+
+    # Every price we record is also a candidate historic low for its store;
+    # SQLite keeps historic_lows up to date itself as history rows go in
+    had_trigger = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_history_low'"
+    ).fetchone()
+    # historic_lows keeps ISO timestamps (ITAD's dates come in that way)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_history_low AFTER INSERT ON price_history
+        BEGIN
+            INSERT INTO historic_lows (app_id, store, price, currency, discount_pct, recorded_at, fetched_at)
+            VALUES (NEW.app_id, NEW.store, NEW.price, NEW.currency, NEW.discount_pct,
+                    {_ISO_FROM_JULIAN.format("NEW.recorded_at")},
+                    {_ISO_FROM_JULIAN.format("NEW.recorded_at")})
+            ON CONFLICT(app_id, store) DO UPDATE SET
+                price        = excluded.price,
+                discount_pct = excluded.discount_pct,
+                recorded_at  = excluded.recorded_at,
+                fetched_at   = excluded.fetched_at
+            WHERE excluded.price < historic_lows.price;
+        END
+    """)
+    if not had_trigger:
+        # Backfill from the history recorded before the trigger existed
+        recorded = _ISO_FROM_JULIAN.format("recorded_at")
+        conn.execute(f"""
+            INSERT INTO historic_lows (app_id, store, price, currency, discount_pct, recorded_at, fetched_at)
+            SELECT app_id, store, MIN(price), currency, discount_pct, {recorded}, {recorded}
+            FROM price_history
+            WHERE true
+            GROUP BY app_id, store
+            ON CONFLICT(app_id, store) DO UPDATE SET
+                price        = excluded.price,
+                discount_pct = excluded.discount_pct,
+                recorded_at  = excluded.recorded_at,
+                fetched_at   = excluded.fetched_at
+            WHERE excluded.price < historic_lows.price
+        """)
+
+    # Older databases predate the summary columns on games; add and backfill them
+    game_columns = {row["name"] for row in conn.execute("PRAGMA table_info(games)")}
+    missing = [
+        (name, decl) for name, decl in (
+            ("num_bundles", "INTEGER DEFAULT 0"),
+            ("historic_low", "REAL"),
+            ("historic_low_store", "TEXT"),
         )
+        if name not in game_columns
+    ]
+    for name, decl in missing:
+        conn.execute(f"ALTER TABLE games ADD COLUMN {name} {decl}")
+
+    # ...and keep games.historic_low current as lows are recorded, so the
+    # deals report reads it straight off games instead of aggregating
+    for event in ("INSERT", "UPDATE OF price"):
+        name = "trg_low_to_game_" + event.split()[0].lower()
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON historic_lows
+            BEGIN
+                UPDATE games SET historic_low = NEW.price, historic_low_store = NEW.store
+                WHERE app_id = NEW.app_id AND (historic_low IS NULL OR NEW.price < historic_low);
+            END
+        """)
+
+    # Record each ITAD lookup in itad_ids, and hand it back to a game as
+    # soon as the game is (re)added. Handing it back (itad_slug going from
+    # NULL to the cached ID) isn't a lookup, so it leaves looked_up_at alone;
+    # asking again, even for the same answer, refreshes it. Dropped first
+    # because databases from before that rule have the old trigger.
+    conn.executescript("""
+        DROP TRIGGER IF EXISTS trg_slug_to_cache;
+        CREATE TRIGGER trg_slug_to_cache AFTER UPDATE OF itad_slug ON games
+        WHEN NEW.itad_slug IS NOT NULL
+        BEGIN
+            INSERT INTO itad_ids (app_id, itad_id) VALUES (NEW.app_id, NEW.itad_slug)
+            ON CONFLICT(app_id) DO UPDATE SET
+                itad_id      = excluded.itad_id,
+                looked_up_at = excluded.looked_up_at
+            WHERE OLD.itad_slug IS NOT NULL OR itad_ids.itad_id IS NOT excluded.itad_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_cache_to_game AFTER INSERT ON games
+        WHEN NEW.itad_slug IS NULL
+            AND EXISTS (SELECT 1 FROM itad_ids WHERE app_id = NEW.app_id)
+        BEGIN
+            UPDATE games SET itad_slug = (SELECT itad_id FROM itad_ids WHERE app_id = NEW.app_id)
+            WHERE app_id = NEW.app_id;
+        END;
     """)
+    if not had_id_cache:
+        # Seed the cache from the IDs already stored on games
+        conn.execute("""
+            INSERT OR IGNORE INTO itad_ids (app_id, itad_id)
+            SELECT app_id, itad_slug FROM games WHERE itad_slug IS NOT NULL
+        """)
+
+    if missing or not had_trigger:
+        refresh_game_summaries()
+
 
-    conn.commit()
-    conn.close()
+# Tables whose layout has changed, each with a check that spots the old
+# layout from its columns ({name: declared type}):
+#   prices, historic_lows  rowid tables with a surrogate id plus a
+#                          UNIQUE(app_id, store) index; now WITHOUT ROWID
+#                          keyed on that pair
+#   price_history          recorded_at as ISO-8601 text; now a REAL Julian
+#                          day (8 bytes instead of ~24)
+_REBUILT_TABLES = {
+    "prices":        lambda cols: "id" in cols,
+    "historic_lows": lambda cols: "id" in cols,
+    "price_history": lambda cols: cols.get("recorded_at") == "TEXT",
+}
+
+# How old column values are converted when copied into a rebuilt table
+_REBUILD_CONVERSIONS = {
+    ("price_history", "recorded_at"): "julianday(recorded_at)",
+}
+
+
+def _column_types(conn: sqlite3.Connection, table: str) -> dict[str, str]:
+    return {row["name"]: row["type"] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _retire_old_tables(conn: sqlite3.Connection) -> None:
+    """
+    Move old-layout tables aside as <name>_v1 so init_db creates them in
+    the new layout; _restore_old_tables() then copies the rows across.
+    The triggers and indexes that name them are dropped first (init_db
+    recreates them).
+    """
+    old = []
+    for table, is_old in _REBUILT_TABLES.items():
+        columns = _column_types(conn, table)
+        if columns and is_old(columns):
+            old.append(table)
+    if not old:
+        return
+    print(f"[DB] Migrating {', '.join(old)} to the new table layout...")
+    with transaction():
+        for trigger in ("trg_history_low", "trg_low_to_game_insert", "trg_low_to_game_update"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        for table in old:
+            indexes = conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                (table,),
+            ).fetchall()
+            for index in indexes:
+                conn.execute(f"DROP INDEX {index['name']}")
+            conn.execute(f"ALTER TABLE {table} RENAME TO {table}_v1")
+
+
+def _restore_old_tables(conn: sqlite3.Connection) -> None:
+    """
+    Copy rows from any <name>_v1 tables left by _retire_old_tables() into
+    the new tables and drop them (also finishes a migration that was
+    interrupted on a previous startup).
+    """
+    for table in _REBUILT_TABLES:
+        old_columns = _column_types(conn, f"{table}_v1")
+        if not old_columns:
+            continue
+        columns = [name for name in _column_types(conn, table) if name in old_columns]
+        values = [_REBUILD_CONVERSIONS.get((table, name), name) for name in columns]
+        with transaction():
+            # OR IGNORE: the old UNIQUE(app_id, store) already ruled out duplicates
+            conn.execute(
+                f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+                f"SELECT {', '.join(values)} FROM {table}_v1"
+            )
+            conn.execute(f"DROP TABLE {table}_v1")
 
 
 def clear_database() -> None:
-    """Drop all tables and reinitialize (for schema changes)."""
-    conn = get_connection()
-    conn.execute("DROP TABLE IF EXISTS price_history")
-    conn.execute("DROP TABLE IF EXISTS historic_lows")
-    conn.execute("DROP TABLE IF EXISTS prices")
-    conn.execute("DROP TABLE IF EXISTS bundles")
-    conn.execute("DROP TABLE IF EXISTS games")
-    conn.commit()
-    conn.close()
+    """
+    Drop all tables and reinitialize (for schema changes). The itad_ids
+    lookup cache is kept, since those IDs don't change; its "ITAD doesn't
+    have it" entries are dropped, as ITAD may have added the game since.
+    """
+    with transaction() as conn:
+        conn.execute("DELETE FROM itad_ids WHERE itad_id = ''")
+        conn.execute("DROP TABLE IF EXISTS price_history")
+        conn.execute("DROP TABLE IF EXISTS historic_lows")
+        conn.execute("DROP TABLE IF EXISTS prices")
+        conn.execute("DROP TABLE IF EXISTS bundles")
+        conn.execute("DROP TABLE IF EXISTS loaded_misses")
+        conn.execute("DROP TABLE IF EXISTS games")
     init_db()
 
 
 # GAME CRUD
 
 def upsert_game(app_id: int, title: str, steam_url: str = None, header_image: str = None) -> None:
-    conn = get_connection()
-    conn.execute("""
-        INSERT INTO games (app_id, title, steam_url, header_image)
-        VALUES (?, ?, ?, ?)
-        ON CONFLICT(app_id) DO UPDATE SET
-            title        = excluded.title,
-            steam_url    = excluded.steam_url,
-            header_image = excluded.header_image
-    """, (app_id, title, steam_url, header_image))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("""
+            INSERT INTO games (app_id, title, steam_url, header_image)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(app_id) DO UPDATE SET
+                title        = excluded.title,
+                steam_url    = excluded.steam_url,
+                header_image = excluded.header_image
+        """, (app_id, title, steam_url, header_image))
+
+
+def upsert_games_bulk(records: list[tuple]) -> None:
+    """
+    upsert_game for many games in one transaction, as one executemany.
+    Each record is (app_id, title, steam_url, header_image).
+    """
+    if not records:
+        return
+    with transaction() as conn:
+        conn.executemany("""
+            INSERT INTO games (app_id, title, steam_url, header_image)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(app_id) DO UPDATE SET
+                title        = excluded.title,
+                steam_url    = excluded.steam_url,
+                header_image = excluded.header_image
+        """, records)
 
 
 def update_itad_slug(app_id: int, slug: str) -> None:
-    conn = get_connection()
-    conn.execute("UPDATE games SET itad_slug = ? WHERE app_id = ?", (slug, app_id))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("UPDATE games SET itad_slug = ? WHERE app_id = ?", (slug, app_id))
+
+
+def get_stale_itad_misses(max_age_days: float) -> set[int]:
+    """
+    Games ITAD had no ID for (itad_slug '') when last asked, more than
+    max_age_days ago, or at an unknown time.
+    """
+    conn = get_connection_ro()
+    return {row[0] for row in conn.execute("""
+        SELECT g.app_id FROM games g
+        LEFT JOIN itad_ids i ON i.app_id = g.app_id
+        WHERE g.itad_slug = ''
+            AND (i.looked_up_at IS NULL OR i.looked_up_at <= julianday('now') - ?)
+    """, (max_age_days,))}
 
 
 def mark_game_checked(app_id: int) -> None:
-    conn = get_connection()
-    conn.execute("UPDATE games SET last_checked = datetime('now') WHERE app_id = ?", (app_id,))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("UPDATE games SET last_checked = datetime('now') WHERE app_id = ?", (app_id,))
 
 
-def get_all_games() -> list[dict]:
-    conn = get_connection()
-    rows = conn.execute("SELECT * FROM games ORDER BY title").fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+def mark_games_checked(app_ids: list[int]) -> None:
+    """mark_game_checked for many games in one transaction (one commit, not one per game)."""
+    with transaction() as conn:
+        conn.executemany(
+            "UPDATE games SET last_checked = datetime('now') WHERE app_id = ?",
+            [(app_id,) for app_id in app_ids],
+        )
+
+
+def get_all_games() -> list[sqlite3.Row]:
+    """
+    All games, in no particular order (the sync loops don't need one).
+    Rows index by column name like dicts (no .get()).
+    """
+    conn = get_connection_ro()
+    return conn.execute("SELECT * FROM games").fetchall()
+
+
+def get_all_games_sorted() -> list[sqlite3.Row]:
+    """All games by title, for display (read in idx_games_title order, no sort)."""
+    conn = get_connection_ro()
+    return conn.execute("SELECT * FROM games ORDER BY title").fetchall()
+
+
+def refresh_game_summaries() -> None:
+    """
+    Recompute games.num_bundles / historic_low / historic_low_store from the
+    bundles and historic_lows tables. Run after a sync so read paths can
+    select them straight off games instead of aggregating per request.
+    """
+    with transaction() as conn:
+        conn.execute("""
+            UPDATE games SET
+                num_bundles = (
+                    SELECT COUNT(*) FROM bundles b WHERE b.app_id = games.app_id
+                ),
+                historic_low = (
+                    SELECT MIN(price) FROM historic_lows h WHERE h.app_id = games.app_id
+                ),
+                historic_low_store = (
+                    SELECT store FROM historic_lows h WHERE h.app_id = games.app_id
+                    ORDER BY price ASC LIMIT 1
+                )
+        """)
+
+
+def analyze_db() -> None:
+    """
+    Refresh the query planner's table statistics. SQLite never does this on
+    its own, so run it after a sync has changed the data substantially.
+    """
+    with transaction() as conn:
+        conn.execute("ANALYZE")
+
+
+def compact_price_history() -> int:
+    """
+    Thin price_history out to the last row recorded per game, store and day.
+    The all-time lows already live in historic_lows (kept by trigger), so
+    the rest of a day's rows only take up pages. Run after a sync.
+    Returns the number of rows removed.
+    """
+    with transaction() as conn:
+        removed = conn.execute("""
+            DELETE FROM price_history WHERE id NOT IN (
+                SELECT MAX(id) FROM price_history
+                GROUP BY app_id, store, date(recorded_at)
+            )
+        """).rowcount
+    if removed and not conn.in_transaction:
+        # Give the freed pages back (a no-op unless the database was
+        # created with auto_vacuum = INCREMENTAL). execute() would only
+        # step the pragma once, freeing a single page; executescript()
+        # runs it to completion, but commits first, hence not inside a
+        # caller's transaction
+        conn.executescript("PRAGMA incremental_vacuum")
+    return removed
 
 
 def delete_game(app_id: int) -> None:
     """Remove a game and all its associated price/bundle data (cascade)."""
-    conn = get_connection()
-    conn.execute("DELETE FROM games WHERE app_id = ?", (app_id,))
-    conn.commit()
-    conn.close()
+    # One transaction so the whole delete costs a single commit
+    with transaction() as conn:
+        # historic_lows has no foreign key to games, so it doesn't cascade
+        conn.execute("DELETE FROM historic_lows WHERE app_id = ?", (app_id,))
+        conn.execute("DELETE FROM games WHERE app_id = ?", (app_id,))
 
 
 # PRICE CRUD
@@ -170,29 +626,36 @@ def upsert_price(app_id: int, store: str, price_current: float,
     Save latest price AND log to history.
     currency should always be 'GBP' conversion happens before this call.
     """
-    conn = get_connection()
-    now = datetime.now(timezone.utc).isoformat()
+    upsert_prices_bulk([
+        (app_id, store, price_current, price_regular, currency, discount_pct, url, drm)
+    ])
 
-    conn.execute("""
-        INSERT INTO prices (app_id, store, price_current, price_regular, currency, discount_pct, url, drm, fetched_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(app_id, store) DO UPDATE SET
-            price_current = excluded.price_current,
-            price_regular = excluded.price_regular,
-            currency      = excluded.currency,
-            discount_pct  = excluded.discount_pct,
-            url           = excluded.url,
-            drm           = excluded.drm,
-            fetched_at    = excluded.fetched_at
-    """, (app_id, store, price_current, price_regular, currency, discount_pct, url, drm, now))
-
-    conn.execute("""
-        INSERT INTO price_history (app_id, store, price, currency, discount_pct, recorded_at)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (app_id, store, price_current, currency, discount_pct, now))
 
-    conn.commit()
-    conn.close()
+def upsert_prices_bulk(records: list[tuple]) -> None:
+    """
+    upsert_price for many rows in one transaction (one commit, not one per price).
+    Each record is (app_id, store, price_current, price_regular, currency,
+    discount_pct, url, drm).
+    """
+    if not records:
+        return
+    with transaction() as conn:
+        conn.executemany(f"""
+            INSERT INTO prices (app_id, store, price_current, price_regular, currency, discount_pct, url, drm, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, {_NOW})
+            ON CONFLICT(app_id, store) DO UPDATE SET
+                price_current = excluded.price_current,
+                price_regular = excluded.price_regular,
+                currency      = excluded.currency,
+                discount_pct  = excluded.discount_pct,
+                url           = excluded.url,
+                drm           = excluded.drm,
+                fetched_at    = excluded.fetched_at
+        """, records)
+        conn.executemany("""
+            INSERT INTO price_history (app_id, store, price, currency, discount_pct, recorded_at)
+            VALUES (?, ?, ?, ?, ?, julianday('now'))
+        """, [(r[0], r[1], r[2], r[4], r[5]) for r in records])
 
 
 def upsert_historic_low(app_id: int, store: str, price: float, 
@@ -202,76 +665,131 @@ def upsert_historic_low(app_id: int, store: str, price: float,
     Save historic low price separately from current prices.
     This tracks the all-time lowest price seen for a game.
     """
-    conn = get_connection()
-    now = datetime.now(timezone.utc).isoformat()
+    upsert_historic_lows_bulk([(app_id, store, price, currency, discount_pct, recorded_date)])
 
-    # First, check if this app_id + store combination exists
-    existing = conn.execute(
-        "SELECT price FROM historic_lows WHERE app_id = ? AND store = ?",
-        (app_id, store)
-    ).fetchone()
 
-    if existing:
-        # Only update if the new price is lower
-        existing_price = existing[0]
-        if price < existing_price:
-            conn.execute("""
-                UPDATE historic_lows 
-                SET price = ?, discount_pct = ?, recorded_at = ?, fetched_at = ?
-                WHERE app_id = ? AND store = ?
-            """, (price, discount_pct, recorded_date, now, app_id, store))
-    else:
-        # Insert new record
-        conn.execute("""
+def upsert_historic_lows_bulk(records: list[tuple]) -> None:
+    """
+    upsert_historic_low for many rows in one transaction. Each record is
+    (app_id, store, price, currency, discount_pct, recorded_date).
+    An existing row is only replaced when the new price is lower; SQLite
+    checks that in the upsert's WHERE, so there's no read-then-write.
+    """
+    if not records:
+        return
+    with transaction() as conn:
+        conn.executemany(f"""
             INSERT INTO historic_lows (app_id, store, price, currency, discount_pct, recorded_at, fetched_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (app_id, store, price, currency, discount_pct, recorded_date, now))
-
-    conn.commit()
-    conn.close()
+            VALUES (?, ?, ?, ?, ?, ?, {_NOW})
+            ON CONFLICT(app_id, store) DO UPDATE SET
+                price        = excluded.price,
+                discount_pct = excluded.discount_pct,
+                recorded_at  = excluded.recorded_at,
+                fetched_at   = excluded.fetched_at
+            WHERE excluded.price < historic_lows.price
+        """, records)
 
 
 def upsert_bundle(app_id: int, bundle_title: str, store: str = None,
                   tier_price: float = None, currency: str = "GBP",
                   bundle_url: str = None, expires_at: str = None) -> None:
-    conn = get_connection()
-    conn.execute("""
-        INSERT OR IGNORE INTO bundles
-            (app_id, bundle_title, store, tier_price, currency, bundle_url, expires_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (app_id, bundle_title, store, tier_price, currency, bundle_url, expires_at))
-    conn.commit()
-    conn.close()
+    upsert_bundles_bulk([(app_id, bundle_title, store, tier_price, currency, bundle_url, expires_at)])
+
+
+def upsert_bundles_bulk(records: list[tuple]) -> None:
+    """
+    upsert_bundle for many rows in one statement. Each record is
+    (app_id, bundle_title, store, tier_price, currency, bundle_url, expires_at).
+    """
+    if not records:
+        return
+    with transaction() as conn:
+        conn.executemany("""
+            INSERT OR IGNORE INTO bundles
+                (app_id, bundle_title, store, tier_price, currency, bundle_url, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, records)
 
 
 # REPORTS
 
-def get_deals_report() -> list[dict]:
+# Best current deal per game (historic lows are kept on games by triggers);
+# the report queries below select from this and add their own projection/filters
+_DEALS_FROM = """
+    WITH best_prices AS (
+        SELECT 
+            app_id,
+            store,
+            price_current,
+            currency,
+            discount_pct,
+            ROW_NUMBER() OVER (PARTITION BY app_id ORDER BY discount_pct DESC, price_current ASC) as rn
+        FROM prices
+        -- "Historic Low..." rows are reference entries, not offers anyone can buy
+        WHERE price_current IS NOT NULL AND store NOT LIKE 'Historic Low%'
+    )
+    {select}
+    FROM games g
+    LEFT JOIN best_prices bp ON g.app_id = bp.app_id AND bp.rn = 1
+    WHERE {where}
+    ORDER BY 
+        CAST(COALESCE(bp.discount_pct, 0) AS INTEGER) DESC,
+        bp.price_current ASC
+"""
+
+
+def _like_contains(text: str) -> str:
+    """
+    LIKE pattern matching text anywhere (use with ESCAPE '\\'). LIKE is
+    case-insensitive for ASCII; its wildcards are escaped so "%" and "_" match literally.
+    """
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _title_contains(column: str, term: str) -> tuple[str, str]:
+    """
+    SQL condition + param matching titles in column that contain term,
+    ignoring case. ASCII terms use LIKE; LIKE doesn't fold non-ASCII
+    letters, so any other term is compared with py_lower() instead.
+    """
+    if term.isascii():
+        return f"{column} LIKE ? ESCAPE '\\'", _like_contains(term)
+    return f"instr(py_lower({column}), ?) > 0", term.lower()
+
+
+def _deals_filters(sale_only: bool, min_discount: int, search: str) -> tuple[str, list]:
+    """WHERE clause + params for the deals report filters."""
+    where = ["bp.app_id IS NOT NULL"]
+    params: list = []
+
+    if sale_only:
+        where.append("COALESCE(bp.discount_pct, 0) > 0")
+    if min_discount:
+        where.append("COALESCE(bp.discount_pct, 0) >= ?")
+        params.append(min_discount)
+    if search:
+        condition, param = _title_contains("g.title", search)
+        where.append(condition)
+        params.append(param)
+
+    return " AND ".join(where), params
+
+
+def get_deals_report(sale_only: bool = False, min_discount: int = None,
+                     search: str = None) -> list[sqlite3.Row]:
     """
     Get all games with their best current deal + historic low.
     Sorted by discount (desc) then price (asc).
+
+    Optional filters are applied in SQL so only matching rows leave SQLite:
+      sale_only     only games with a best discount above 0%
+      min_discount  only games with a best discount of at least this %
+      search        case-insensitive substring match on the title
     """
-    conn = get_connection()
-    rows = conn.execute("""
-        WITH best_prices AS (
-            SELECT 
-                app_id,
-                store,
-                price_current,
-                currency,
-                discount_pct,
-                ROW_NUMBER() OVER (PARTITION BY app_id ORDER BY discount_pct DESC, price_current ASC) as rn
-            FROM prices
-            WHERE price_current IS NOT NULL
-        ),
-        lowest_recorded AS (
-            SELECT 
-                app_id,
-                MIN(price) as lowest_price
-            FROM historic_lows
-            WHERE price IS NOT NULL
-            GROUP BY app_id
-        )
+    where, params = _deals_filters(sale_only, min_discount, search)
+    conn = get_connection_ro()
+    return conn.execute(_DEALS_FROM.format(select="""
         SELECT 
             g.app_id,
             g.title,
@@ -279,74 +797,187 @@ def get_deals_report() -> list[dict]:
             bp.price_current AS best_price,
             bp.currency,
             bp.discount_pct AS best_discount,
-            lr.lowest_price AS historic_low
-        FROM games g
-        LEFT JOIN best_prices bp ON g.app_id = bp.app_id AND bp.rn = 1
-        LEFT JOIN lowest_recorded lr ON g.app_id = lr.app_id
-        WHERE bp.app_id IS NOT NULL
-        ORDER BY 
-            CAST(COALESCE(bp.discount_pct, 0) AS INTEGER) DESC,
-            bp.price_current ASC
-    """).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+            g.historic_low
+    """, where=where), params).fetchall()
+
+
+def get_report_rows(sale_only: bool = False, min_discount: int = None) -> list[tuple]:
+    """
+    The deals report as flat tuples for the CLI table, defaults already
+    filled in by SQLite:
+      (title, best_store, best_price, best_discount, historic_low, currency)
+    best_discount is never None (0) and currency defaults to 'GBP'.
+    Filters and ordering are the same as get_deals_report().
+    """
+    where, params = _deals_filters(sale_only, min_discount, None)
+    cur = get_connection_ro().cursor()
+    cur.row_factory = None
+    rows = cur.execute(_DEALS_FROM.format(select="""
+        SELECT 
+            g.title,
+            bp.store,
+            bp.price_current,
+            COALESCE(bp.discount_pct, 0),
+            g.historic_low,
+            COALESCE(bp.currency, 'GBP')
+    """, where=where), params).fetchall()
+    return rows
+
+
+def get_best_prices(exclude_stores: list[str] = None) -> dict[int, dict]:
+    """
+    Cheapest current price per game, ignoring any stores in exclude_stores.
+    This is the same reduction the dashboard does in JS when stores are
+    excluded, done in one grouped query instead.
+
+    Returns {app_id: {store, price_current, discount_pct}}.
+    """
+    where = ["price_current IS NOT NULL", "store NOT LIKE 'Historic Low%'"]
+    params: list = []
+    if exclude_stores:
+        where.append(f"store NOT IN ({','.join('?' * len(exclude_stores))})")
+        params.extend(exclude_stores)
+
+    conn = get_connection_ro()
+    # SQLite fills bare columns from the row that produced MIN()
+    rows = conn.execute(f"""
+        SELECT app_id, store, MIN(price_current) AS price_current, discount_pct
+        FROM prices
+        WHERE {" AND ".join(where)}
+        GROUP BY app_id
+    """, params).fetchall()
+    return {
+        r["app_id"]: {
+            "store": r["store"],
+            "price_current": r["price_current"],
+            "discount_pct": r["discount_pct"] or 0,
+        }
+        for r in rows
+    }
 
 
 def get_all_prices_for_game(app_id: int) -> list[dict]:
     """All current store prices for a single game."""
-    conn = get_connection()
+    conn = get_connection_ro()
     rows = conn.execute("""
         SELECT store, price_current, price_regular, currency, discount_pct, url, drm, fetched_at
         FROM prices WHERE app_id = ?
         ORDER BY price_current ASC
     """, (app_id,)).fetchall()
-    conn.close()
     return [dict(r) for r in rows]
 
 
-def get_game_price_history(app_id: int) -> list[dict]:
-    """Get price history for a specific game."""
-    conn = get_connection()
-    rows = conn.execute(
-        "SELECT * FROM price_history WHERE app_id = ? ORDER BY recorded_at DESC",
-        (app_id,)
-    ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+def iter_game_price_history(app_id: int) -> Iterator[sqlite3.Row]:
+    """
+    Price history for a specific game, newest first, yielded in batches of
+    1000 rows so a long history is never held in memory all at once.
+    """
+    conn = get_connection_ro()
+    cur = conn.execute(f"""
+        SELECT id, app_id, store, price, currency, discount_pct,
+               {_ISO_FROM_JULIAN.format("recorded_at")} AS recorded_at
+        FROM price_history WHERE app_id = ?
+        ORDER BY price_history.recorded_at DESC, id DESC
+    """, (app_id,))
+    cur.arraysize = 1000
+    while batch := cur.fetchmany():
+        yield from batch
+
+
+def get_game_price_history(app_id: int) -> list[sqlite3.Row]:
+    """Get price history for a specific game (rows, not dicts: it can be long)."""
+    return list(iter_game_price_history(app_id))
+
+
+def get_steam_baselines() -> dict[int, float]:
+    """Steam's full (pre-discount) price per game: {app_id: price_regular}."""
+    conn = get_connection_ro()
+    return dict(conn.execute(
+        "SELECT app_id, price_regular FROM prices WHERE store = 'Steam' AND price_regular IS NOT NULL"
+    ).fetchall())
+
+
+def get_store_urls(store: str) -> dict[int, str]:
+    """The page each game was last priced from at one store: {app_id: url}."""
+    conn = get_connection_ro()
+    return dict(conn.execute(
+        "SELECT app_id, url FROM prices WHERE store = ? AND url IS NOT NULL", (store,)
+    ).fetchall())
+
+
+def get_loaded_misses(max_age_days: float) -> set[int]:
+    """Games a full Loaded.com search failed to find in the last max_age_days."""
+    conn = get_connection_ro()
+    return {row[0] for row in conn.execute(
+        "SELECT app_id FROM loaded_misses WHERE missed_at > julianday('now') - ?", (max_age_days,)
+    )}
+
+
+def update_loaded_misses(missed: list[int], found: list[int]) -> None:
+    """Stamp this sync's Loaded.com misses and forget the games that were found."""
+    with transaction() as conn:
+        conn.executemany("""
+            INSERT INTO loaded_misses (app_id) VALUES (?)
+            ON CONFLICT(app_id) DO UPDATE SET missed_at = excluded.missed_at
+        """, [(app_id,) for app_id in missed])
+        conn.executemany("DELETE FROM loaded_misses WHERE app_id = ?", [(app_id,) for app_id in found])
 
 
 def get_game_bundles(app_id: int) -> list[dict]:
     """Get bundle history for a specific game."""
-    conn = get_connection()
+    conn = get_connection_ro()
     rows = conn.execute(
         "SELECT * FROM bundles WHERE app_id = ? ORDER BY expires_at DESC",
         (app_id,)
     ).fetchall()
-    conn.close()
     return [dict(r) for r in rows]
 
 
 def get_game_by_id(app_id: int) -> dict | None:
-    conn = get_connection()
+    conn = get_connection_ro()
     row = conn.execute("SELECT * FROM games WHERE app_id = ?", (app_id,)).fetchone()
-    conn.close()
     return dict(row) if row else None
 
 
+def get_game_by_title(title: str) -> dict | None:
+    """
+    Game whose title is exactly title, ignoring case. An indexed NOCASE
+    lookup for ASCII titles; NOCASE only folds ASCII letters, so other
+    titles are compared with py_lower() (a scan of games).
+    """
+    conn = get_connection_ro()
+    if title.isascii():
+        row = conn.execute(
+            "SELECT * FROM games WHERE title = ? COLLATE NOCASE LIMIT 1", (title,)
+        ).fetchone()
+    else:
+        row = conn.execute(
+            "SELECT * FROM games WHERE py_lower(title) = ? LIMIT 1", (title.lower(),)
+        ).fetchone()
+    return dict(row) if row else None
+
+
+def search_games(term: str) -> list[dict]:
+    """Games whose title contains term (case-insensitive), ordered by title."""
+    condition, param = _title_contains("title", term)
+    conn = get_connection_ro()
+    rows = conn.execute(
+        f"SELECT * FROM games WHERE {condition} ORDER BY title", (param,)
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
 def get_stats() -> dict:
-    """Get summary statistics for the database."""
-    conn = get_connection()
-    
-    total_games = conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
-    total_bundles = conn.execute("SELECT COUNT(*) FROM bundles").fetchone()[0]
-    games_with_prices = conn.execute(
-        "SELECT COUNT(DISTINCT app_id) FROM prices"
-    ).fetchone()[0]
-    
-    conn.close()
-    
-    return {
-        "total_games": total_games,
-        "total_bundles": total_bundles,
-        "games_with_prices": games_with_prices,
-    }
+    """Get summary statistics for the database (one round trip)."""
+    conn = get_connection_ro()
+    row = conn.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM games)                  AS total_games,
+            (SELECT COUNT(*) FROM bundles)                AS total_bundles,
+            (SELECT COUNT(*) FROM prices)                 AS total_prices,
+            (SELECT COUNT(DISTINCT app_id) FROM prices)   AS games_with_prices,
+            -- Answered from the partial idx_prices_onsale
+            (SELECT COUNT(DISTINCT app_id) FROM prices
+             WHERE discount_pct > 0 AND store NOT LIKE 'Historic Low%') AS on_sale
+    """).fetchone()
+    return dict(row)
@@ -27,22 +27,69 @@ Key concepts:
   - We first convert Steam App ID ITAD UUID via the lookup endpoint.
   - That UUID is then used for all price/bundle queries.
   - UUIDs are cached in the DB (itad_slug column) so we only look them up once.
+    Games ITAD doesn't have are cached as '' and only looked up again after
+    NO_ID_RECHECK_DAYS.
 """
 
+import os
 import requests
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from ratelimit import RateLimiter
 from database import (
     get_all_games,
     upsert_game,
     update_itad_slug,
-    mark_game_checked,
-    upsert_price,
-    upsert_historic_low,  # Add this import
-    upsert_bundle,
-    get_connection,  # Add this import for discount recalculation
+    mark_games_checked,
+    upsert_prices_bulk,
+    upsert_historic_lows_bulk,
+    upsert_bundles_bulk,
+    refresh_game_summaries,
+    compact_price_history,
+    analyze_db,
+    get_steam_baselines,
+    get_stale_itad_misses,
+    transaction,
 )
 
+# orjson decodes the multi-megabyte prices/v3 chunks faster than the stdlib
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
 BASE_URL = "https://api.isthereanydeal.com"
 
+MAX_WORKERS = 8  # ITAD chunk requests in flight at once
+MAX_RATE = 5     # ITAD requests started per second, across all workers
+CHUNK_SIZE = 100  # game IDs per ITAD POST (the API's per-request limit)
+NO_ID_RECHECK_DAYS = 7  # ask again about games ITAD didn't have after this long
+
+# Per-deal "Saving: ..." lines run to thousands per sync; only print them
+# when ITAD_VERBOSE=1 is set in the environment
+VERBOSE = os.getenv("ITAD_VERBOSE") == "1"
+
+# One session for every ITAD call keeps the TLS connection to the API alive
+# across chunks instead of reconnecting per request. ITAD's POST endpoints
+# are lookups with no side effects, so they're safe to retry on 429/5xx.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=1,  # api.isthereanydeal.com
+    pool_maxsize=MAX_WORKERS,
+    max_retries=Retry(
+        total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"POST"}),
+    ),
+))
+# Retry also honours a 429's Retry-After header, sleeping for it before
+# trying again instead of failing the chunk
+
+
+_limiter = RateLimiter(MAX_RATE)
+
 
 def _warn_itad(err: Exception, what: str) -> None:
     """
@@ -61,8 +108,17 @@ def _warn_itad(err: Exception, what: str) -> None:
 
 
 def _headers() -> dict:
-    """Standard headers for ITAD requests (no auth key goes in query params)."""
-    return {"Content-Type": "application/json"}
+    """
+    Standard headers for ITAD requests (no auth key goes in query params).
+
+    Compressed responses are asked for explicitly. The prices/v3 chunks are
+    the biggest transfer in a sync and shrink several-fold. urllib3 only
+    lists br when a brotli package is installed to decode it.
+    """
+    return {
+        "Content-Type": "application/json",
+        "Accept-Encoding": DEFAULT_ACCEPT_ENCODING,
+    }
 
 
 def lookup_itad_ids(app_ids: list[int], api_key: str) -> dict[int, str]:
@@ -78,36 +134,56 @@ def lookup_itad_ids(app_ids: list[int], api_key: str) -> dict[int, str]:
     Response: dict keyed by those same strings e.g. {"app/1091500": "uuid...", ...}
     A null value means ITAD doesn't have that game.
 
-    Chunked into groups of 100 (API limit per request).
+    Chunked into groups of 100 (API limit per request). Chunks are posted
+    MAX_WORKERS at a time over the shared session, paced by the rate limiter.
     """
     STEAM_SHOP_ID = 61  # Steam's numeric ID in the ITAD shop registry
-    CHUNK_SIZE = 100
     result: dict[int, str] = {}
 
-    for i in range(0, len(app_ids), CHUNK_SIZE):
-        chunk_ids = app_ids[i:i + CHUNK_SIZE]
-        # Format: "app/{steam_app_id}" ITAD's shop ID format for Steam
-        payload = [f"app/{aid}" for aid in chunk_ids]
-
-        resp = requests.post(
+    def lookup_chunk(chunk_ids: list[int]) -> dict:
+        _limiter.wait()
+        resp = _session.post(
             f"{BASE_URL}/lookup/id/shop/{STEAM_SHOP_ID}/v1",
             params={"key": api_key},
             headers=_headers(),
-            json=payload,
+            # Format: "app/{steam_app_id}" ITAD's shop ID format for Steam
+            json=[f"app/{aid}" for aid in chunk_ids],
             timeout=20,
         )
         resp.raise_for_status()
 
         # Response is a dict: {"app/570": "uuid...", "app/1091500": null, ...}
-        data = resp.json()
-        for app_id, itad_uuid in zip(chunk_ids, [data.get(f"app/{aid}") for aid in chunk_ids]):
-            if itad_uuid:
-                result[app_id] = itad_uuid
+        return _loads(resp.content)
+
+    chunks = [app_ids[i:i + CHUNK_SIZE] for i in range(0, len(app_ids), CHUNK_SIZE)]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        # map() re-raises a failed chunk here, as the sequential loop did
+        for data in pool.map(lookup_chunk, chunks):
+            for key, itad_uuid in data.items():
+                if itad_uuid and key.startswith("app/"):
+                    result[int(key[4:])] = itad_uuid
 
     print(f"[ITAD] Matched {len(result)}/{len(app_ids)} games to ITAD IDs.")
     return result
 
 
+def _post_games(path: str, chunk: list[str], api_key: str):
+    """POST a chunk of ITAD game IDs to a /games endpoint (GB prices); returns parsed JSON."""
+    _limiter.wait()
+    resp = _session.post(
+        f"{BASE_URL}{path}",
+        params={
+            "country": "GB", 
+            "key": api_key
+        },
+        headers=_headers(),
+        json=chunk,
+        timeout=30,
+    )
+    resp.raise_for_status()
+    return _loads(resp.content)
+
+
 def fetch_all_data(itad_ids: list[str], api_key: str) -> tuple[dict, dict, dict]:
     """
     Fetch all game data using prices/v3 endpoint.
@@ -118,33 +194,45 @@ def fetch_all_data(itad_ids: list[str], api_key: str) -> tuple[dict, dict, dict]
     - Plus all shop data in one call
     
     Then fetch bundles separately from overview/v2.
+
+    Each chunk's two requests go out over the shared session a few chunks
+    ahead of the one being handled (about MAX_WORKERS requests in flight),
+    and the responses are handled in chunk order.
     
     Returns: (prices_map, historic_map, bundles_map)
     """
-    CHUNK_SIZE = 100
-    prices_map: dict[str, list] = {}
+    prices_map: dict[str, list] = defaultdict(list)
     historic_map: dict[str, dict] = {}
-    bundles_map: dict[str, list] = {}
+    bundles_map: dict[str, list] = defaultdict(list)
     all_stores_found = set()
 
-    for i in range(0, len(itad_ids), CHUNK_SIZE):
-        chunk = itad_ids[i:i + CHUNK_SIZE]
-
+    starts = iter(range(0, len(itad_ids), CHUNK_SIZE))
+    pool = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    pending = deque()
+
+    def submit_next_chunk() -> None:
+        i = next(starts, None)
+        if i is not None:
+            chunk = itad_ids[i:i + CHUNK_SIZE]
+            pending.append((
+                i,
+                pool.submit(_post_games, "/games/prices/v3", chunk, api_key),
+                pool.submit(_post_games, "/games/overview/v2", chunk, api_key),
+            ))
+
+    # Two requests per chunk, so this keeps about MAX_WORKERS in flight
+    for _ in range(max(1, MAX_WORKERS // 2)):
+        submit_next_chunk()
+
+    # Chunks are only submitted as earlier ones are handled, and popped once
+    # handled, so at most a few chunks' responses are held at a time rather
+    # than every chunk's full JSON staying alive until the end of the sync
+    while pending:
+        i, prices_future, overview_future = pending.popleft()
+        submit_next_chunk()
         # ══ CALL 1: Fetch prices/v3 - includes all shops and historic low ══
         try:
-            resp_prices = requests.post(
-                f"{BASE_URL}/games/prices/v3",
-                params={
-                    "country": "GB", 
-                    "key": api_key
-                },
-                headers=_headers(),
-                json=chunk,
-                timeout=30,
-            )
-            resp_prices.raise_for_status()
-
-            data_prices = resp_prices.json()
+            data_prices = prices_future.result()
             
             # prices/v3 returns a list of games
             if isinstance(data_prices, list):
@@ -169,8 +257,6 @@ def fetch_all_data(itad_ids: list[str], api_key: str) -> tuple[dict, dict, dict]
                         chunk_stores.add(shop_name)
                         all_stores_found.add(shop_name)
                     
-                    if game_id not in prices_map:
-                        prices_map[game_id] = []
                     prices_map[game_id].extend(deals)
                 
                 # === HISTORIC LOW: historyLow.all ===
@@ -199,126 +285,111 @@ def fetch_all_data(itad_ids: list[str], api_key: str) -> tuple[dict, dict, dict]
 
         # ══ CALL 2: Fetch bundles from overview/v2 ══
         try:
-            resp_overview = requests.post(
-                f"{BASE_URL}/games/overview/v2",
-                params={
-                    "country": "GB", 
-                    "key": api_key
-                },
-                headers=_headers(),
-                json=chunk,
-                timeout=30,
-            )
-            resp_overview.raise_for_status()
-
-            data_overview = resp_overview.json()
+            data_overview = overview_future.result()
             bundles_list = data_overview.get("bundles", [])
             
             # Extract bundles
             for bundle in bundles_list:
                 game_id = bundle.get("id")
                 if game_id:
-                    if game_id not in bundles_map:
-                        bundles_map[game_id] = []
                     bundles_map[game_id].append(bundle)
         
         except Exception as e:
             _warn_itad(e, f"bundles (chunk {(i // CHUNK_SIZE) + 1})")
+    pool.shutdown()
 
     print(f"\n[ITAD] Total: {len(prices_map)} games with prices, {len(historic_map)} with historic lows, {len(bundles_map)} with bundles")
     print(f"[ITAD] Unique stores found: {len(all_stores_found)}")
     if all_stores_found:
         print(f"[ITAD]   {', '.join(sorted(all_stores_found))}")
     
-    return prices_map, historic_map, bundles_map
-def _recalculate_discounts_from_steam(app_id: int) -> None:
+    # Plain dicts back, so a lookup of a missing game can't insert an empty list
+    return dict(prices_map), historic_map, dict(bundles_map)
+def _recalculate_discounts_from_steam() -> None:
     """
-    Recalculate all discounts for a game using Steam's original price as baseline.
+    Recalculate all discounts for ITAD-matched games using Steam's original
+    price as baseline.
     
     Steam's price_overview.initial field is the original/full price before any discount.
     This is the authoritative baseline for calculating discounts across all stores.
     
     Formula: discount% = ((steam_initial - current_price) / steam_initial) * 100
+    clamped to [0, 100]. One set-based UPDATE for every game, instead of a
+    query plus an UPDATE per price row per game.
     """
-    conn = get_connection()
-    
     try:
-        # Get Steam's ORIGINAL (initial) price as the universal baseline
-        # This is Steam's official "full price" before discounts
-        steam_row = conn.execute(
-            "SELECT price_regular FROM prices WHERE app_id = ? AND store = 'Steam' AND price_regular IS NOT NULL",
-            (app_id,)
-        ).fetchone()
-        
-        if not steam_row or not steam_row[0]:
-            # No Steam baseline available, skip discount recalculation
-            return
-        
-        steam_baseline = float(steam_row[0])
-        
-        if steam_baseline <= 0:
-            # Invalid baseline, skip
-            return
-        
-        # Get all prices (including Steam itself) for discount calculation
-        all_prices = conn.execute(
-            "SELECT id, store, price_current FROM prices WHERE app_id = ? AND price_current IS NOT NULL",
-            (app_id,)
-        ).fetchall()
-        
-        recalculated_count = 0
-        for price_id, store_name, current_price in all_prices:
-            if current_price is None or current_price < 0:
-                continue
-            
-            # Calculate discount as percentage off Steam's original price
-            discount_pct = int(((steam_baseline - current_price) / steam_baseline) * 100)
-            
-            # Clamp to [0, 100] - discount can't be negative or over 100%
-            discount_pct = max(0, min(100, discount_pct))
-            
-            # Update the discount
-            conn.execute(
-                "UPDATE prices SET discount_pct = ? WHERE id = ?",
-                (discount_pct, price_id)
-            )
-            recalculated_count += 1
-        
-        conn.commit()
-        
-        if recalculated_count > 0:
-            print(f"[ITAD] Game {app_id}: Recalculated {recalculated_count} prices (baseline: £{steam_baseline:.2f})")
+        # A savepoint when called inside sync_prices' transaction, so a
+        # failure here only undoes the recalculation
+        with transaction() as conn:
+            recalculated_count = conn.execute("""
+                UPDATE prices SET discount_pct = MAX(0, MIN(100,
+                    CAST((b.baseline - prices.price_current) / b.baseline * 100 AS INTEGER)))
+                FROM (
+                    SELECT app_id, price_regular AS baseline FROM prices
+                    WHERE store = 'Steam' AND price_regular > 0
+                ) AS b
+                WHERE prices.app_id = b.app_id
+                  AND prices.price_current >= 0
+                  AND prices.app_id IN (SELECT app_id FROM games WHERE itad_slug <> '')
+            """).rowcount
+        print(f"[ITAD] Recalculated {recalculated_count} prices against Steam baselines")
     
     except Exception as e:
-        print(f"[ITAD] Error recalculating discounts for app {app_id}: {e}")
-    finally:
-        conn.close()
+        print(f"[ITAD] Error recalculating discounts: {e}")
+
+
+def finalize_prices() -> None:
+    """
+    Recalculate discounts against Steam's baselines and refresh the games
+    summary columns, in one transaction. sync_prices() ends with this
+    unless told not to; the full syncs (cmd_sync, run_full_sync) run it
+    once both price stages are done, so Loaded.com's prices are included.
+    """
+    with transaction():
+        # Recalculate discounts based on Steam baseline
+        print(f"\n[ITAD] Recalculating discounts based on Steam prices...")
+        _recalculate_discounts_from_steam()
+
+        # Denormalise bundle counts and historic lows onto games for the dashboard
+        refresh_game_summaries()
 
 
-def sync_prices(api_key: str) -> None:
+def sync_prices(api_key: str, finalize: bool = True) -> None:
     """
     Full ITAD price sync. Fetches current prices, historic lows, and
     bundle history for every game in the database, all in GBP.
+
+    finalize=False leaves out finalize_prices(), for a caller that runs
+    it itself after other stores' prices are in.
     """
     games = get_all_games()
     if not games:
         print("[ITAD] No games in DB. Run Steam sync first.")
         return
 
-    needs_lookup = [g for g in games if not g["itad_slug"]]
-    steam_to_itad: dict[int, str] = {
-        g["app_id"]: g["itad_slug"] for g in games if g["itad_slug"]
-    }
+    # itad_slug is NULL for games never looked up, and '' for games ITAD
+    # said it doesn't have, so those are only asked about again once the
+    # answer is NO_ID_RECHECK_DAYS old (ITAD may have added them since)
+    recheck = get_stale_itad_misses(NO_ID_RECHECK_DAYS)
+    needs_lookup = []
+    itad_to_steam: dict[str, int] = {}
+    for g in games:
+        if g["itad_slug"] is None or g["app_id"] in recheck:
+            needs_lookup.append(g["app_id"])
+        elif g["itad_slug"]:
+            itad_to_steam[g["itad_slug"]] = g["app_id"]
 
     if needs_lookup:
-        print(f"[ITAD] Looking up IDs for {len(needs_lookup)} new games...")
-        new_map = lookup_itad_ids([g["app_id"] for g in needs_lookup], api_key)
-        for app_id, itad_id in new_map.items():
-            update_itad_slug(app_id, itad_id)
-            steam_to_itad[app_id] = itad_id
+        print(f"[ITAD] Looking up IDs for {len(needs_lookup)} new or unmatched games...")
+        new_map = lookup_itad_ids(needs_lookup, api_key)
+        with transaction():
+            for app_id in needs_lookup:
+                itad_id = new_map.get(app_id, "")
+                update_itad_slug(app_id, itad_id)
+                if itad_id:
+                    itad_to_steam[itad_id] = app_id
 
-    itad_to_steam: dict[str, int] = {v: k for k, v in steam_to_itad.items()}
-    itad_ids = list(itad_to_steam.keys())
+    itad_ids = list(itad_to_steam)
 
     if not itad_ids:
         print("[ITAD] No games matched to ITAD. Check your API key.")
@@ -339,40 +410,49 @@ def sync_prices(api_key: str) -> None:
     # Load Steam's baseline prices once (before saving ITAD prices)
     steam_baselines = {}
     try:
-        baseline_conn = get_connection()
-        baseline_rows = baseline_conn.execute(
-            "SELECT app_id, price_regular FROM prices WHERE store = 'Steam' AND price_regular IS NOT NULL"
-        ).fetchall()
-        baseline_conn.close()
-        for app_id, baseline in baseline_rows:
-            steam_baselines[app_id] = baseline
+        steam_baselines = get_steam_baselines()
         print(f"[ITAD] Loaded Steam baselines for {len(steam_baselines)} games")
     except Exception as e:
         print(f"[ITAD] Warning: Could not load Steam baselines: {e}")
 
-    # Save current prices
+    # Map ITAD IDs back to Steam app IDs once (dropping any we can't map);
+    # the loops below all work on these
+    deals_by_app = [
+        (app_id, deals) for itad_id, deals in prices_map.items()
+        if (app_id := itad_to_steam.get(itad_id))
+    ]
+    low_by_app = [
+        (app_id, low) for itad_id, low in historic_map.items()
+        if (app_id := itad_to_steam.get(itad_id))
+    ]
+    bundles_by_app = [
+        (app_id, bundle_list) for itad_id, bundle_list in bundles_map.items()
+        if (app_id := itad_to_steam.get(itad_id))
+    ]
+
+    # Collect current prices, historic lows and bundles, then write them all
+    # in one transaction below
     games_with_no_deals = []
-    total_prices_saved = 0
+    games_with_prices = 0
+    debug_single_store_games = []  # reported below: games only 1 store sells
+    price_records = []
     
-    for itad_id, deals in prices_map.items():
-        app_id = itad_to_steam.get(itad_id)
-        if not app_id:
-            continue
-        
+    for app_id, deals in deals_by_app:
         if not deals:
             games_with_no_deals.append(app_id)
             continue
+        games_with_prices += 1
+        if len(deals) == 1:
+            debug_single_store_games.append((app_id, deals[0].get("shop", {}).get("name", "unknown")))
         
         # Get this game's Steam baseline (if it exists)
         steam_baseline = steam_baselines.get(app_id)
             
         for deal in deals:
-            shop  = deal.get("shop", {}).get("name", "unknown")
-            price = deal.get("price", {})
-            
-            current = price.get("amount")
+            current = (deal.get("price") or {}).get("amount")
             if current is None:
                 continue
+            shop = (deal.get("shop") or {}).get("name", "unknown")
             
             # Use Steam's baseline for all ITAD prices (not ITAD's regular field)
             regular = steam_baseline
@@ -381,28 +461,13 @@ def sync_prices(api_key: str) -> None:
             drm_list = deal.get("drm", [])
             drm_str = ",".join([d.get("name", "Unknown") for d in drm_list]) if drm_list else None
             
-            print(f"[ITAD] Saving: App {app_id} @ {shop} = £{current} (discount {deal.get('cut', 0)}%)")
+            if VERBOSE:
+                print(f"[ITAD] Saving: App {app_id} @ {shop} = £{current} (discount {deal.get('cut', 0)}%)")
             
-            upsert_price(
-                app_id=app_id,
-                store=shop,
-                price_current=current,
-                price_regular=regular,
-                currency="GBP",
-                discount_pct=0,  # Will be recalculated properly based on Steam baseline
-                url=deal.get("url"),
-                drm=drm_str,
-            )
-            total_prices_saved += 1
-    
-    print(f"[ITAD] Saved {total_prices_saved} current prices across all games")
-    
+            # discount_pct 0: recalculated properly below based on Steam baseline
+            price_records.append((app_id, shop, current, regular, "GBP", 0, deal.get("url"), drm_str))
+
     # Report games with only 1 store
-    debug_single_store_games = []
-    for itad_id, deals in prices_map.items():
-        if len(deals) == 1:
-            debug_single_store_games.append((itad_to_steam.get(itad_id), deals[0].get("shop", {}).get("name", "unknown")))
-    
     if debug_single_store_games and len(debug_single_store_games) > 5:
         print(f"[ITAD]  {len(debug_single_store_games)} games only available from 1 store")
         print(f"[ITAD]  Examples:")
@@ -415,58 +480,58 @@ def sync_prices(api_key: str) -> None:
         for aid in games_with_no_deals[:10]:
             print(f"[ITAD]    - {all_games_map.get(aid, 'Unknown')} (App ID: {aid})")
 
-    # Save historic lows
-    for itad_id, low in historic_map.items():
-        app_id = itad_to_steam.get(itad_id)
-        if not app_id or not low.get("price"):
+    # Historic lows
+    low_records = []
+    for app_id, low in low_by_app:
+        if not low.get("price"):
             continue
         
-        print(f"[ITAD] Saving historic low: App {app_id} = {low['price']} @ {low['shop']}")
+        if VERBOSE:
+            print(f"[ITAD] Saving historic low: App {app_id} = {low['price']} @ {low['shop']}")
         
-        upsert_historic_low(
-            app_id=app_id,
-            store=low["shop"],
-            price=low["price"],
-            currency="GBP",
-            discount_pct=low.get("cut", 0),
-            recorded_date=low.get("date"),
-        )
+        low_records.append((app_id, low["shop"], low["price"], "GBP", low.get("cut", 0), low.get("date")))
 
-    # Save bundles
-    for itad_id, bundle_list in bundles_map.items():
-        app_id = itad_to_steam.get(itad_id)
-        if not app_id:
-            continue
+    # Bundles
+    bundle_records = []
+    for app_id, bundle_list in bundles_by_app:
         for bundle in bundle_list:
             tiers = bundle.get("tiers", [])
             tier_price = None
             if tiers:
-                sorted_tiers = sorted(
-                    tiers, key=lambda t: t.get("price", {}).get("amount", 9999)
-                )
-                tier_price = sorted_tiers[0].get("price", {}).get("amount")
-            upsert_bundle(
-                app_id=app_id,
-                bundle_title=bundle.get("title", "Unknown Bundle"),
-                store=bundle.get("type", ""),
-                tier_price=tier_price,
-                currency="USD",
-                bundle_url=bundle.get("url"),
-                expires_at=bundle.get("expiry"),
-            )
-
-    # Recalculate discounts based on Steam baseline
-    print(f"\n[ITAD] Recalculating discounts based on Steam prices...")
-    for app_id in steam_to_itad.keys():
-        _recalculate_discounts_from_steam(app_id)
-
-    for app_id in steam_to_itad.keys():
-        mark_game_checked(app_id)
+                cheapest = min(tiers, key=lambda t: t.get("price", {}).get("amount", 9999))
+                tier_price = cheapest.get("price", {}).get("amount")
+            bundle_records.append((
+                app_id,
+                bundle.get("title", "Unknown Bundle"),
+                bundle.get("type", ""),
+                tier_price,
+                "USD",
+                bundle.get("url"),
+                bundle.get("expiry"),
+            ))
+
+    # One commit for the whole sync instead of one per helper call
+    with transaction():
+        upsert_prices_bulk(price_records)
+        total_prices_saved = len(price_records)
+        print(f"[ITAD] Saved {total_prices_saved} current prices across all games")
+
+        upsert_historic_lows_bulk(low_records)
+        upsert_bundles_bulk(bundle_records)
+
+        mark_games_checked(list(itad_to_steam.values()))
+
+        if finalize:
+            finalize_prices()
+
+    removed = compact_price_history()
+    if removed:
+        print(f"[ITAD] Compacted price history ({removed} same-day entries removed)")
+    analyze_db()
 
     # Summary
-    games_with_prices = sum(1 for g in prices_map.values() if g)
     print(f"[ITAD] Done. {games_with_prices}/{len(itad_ids)} games had prices available")
-    print(f"[ITAD] Total: {total_prices_saved} prices saved, {len(historic_map)} historic lows, {sum(len(b) for b in bundles_map.values())} bundles")
+    print(f"[ITAD] Total: {total_prices_saved} prices saved, {len(historic_map)} historic lows, {len(bundle_records)} bundles")
 
 
 def sync_loaded(steam_id_to_title: dict = None) -> None:
@@ -11,21 +11,83 @@ Handles title matching issues:
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 import re
 from typing import Optional, Dict
 from datetime import datetime, timezone
 from difflib import SequenceMatcher
+from functools import lru_cache
+import atexit
+import importlib.util
+import random
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ratelimit import parse_retry_after
+
+# lxml builds the BeautifulSoup tree in C, several times faster than the
+# pure-Python html.parser on full product pages. It's optional, and bs4
+# loads it by name, so it's only looked for here rather than imported
+_BS4_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+# rapidfuzz's C++ ratio stands in for difflib's pure-Python SequenceMatcher;
+# the scores are close, and they only decide whether to log a title mismatch
+try:
+    from rapidfuzz.fuzz import ratio as _fuzz_ratio
+except ImportError:
+    _fuzz_ratio = None
 
 LOADED_BASE = "https://www.loaded.com"
 LOADED_TIMEOUT = 20
+PROBE_WORKERS = 4  # wildcard URL probes in flight at once, per scrape
+MAX_IN_FLIGHT = 4  # Loaded requests in flight at once, across every scrape and probe
+
+# Slug suffixes tried by search_loaded_with_wildcards, in order: exact, the
+# last three release years (from the clock, so they don't go stale), editions
+_CURRENT_YEAR = datetime.now().year
+_PATTERN_SUFFIXES = [
+    "",
+    f"-{_CURRENT_YEAR}",
+    f"-{_CURRENT_YEAR - 1}",
+    f"-{_CURRENT_YEAR - 2}",
+    "-deluxe",
+    "-ultimate",
+    "-standard",
+]
+
+# Search result pages are only read for their links, so only <a> elements
+# (with their text) are built into the tree; scripts and layout are skipped.
+# The hit class is matched afterwards: at parse time a strainer sees the raw
+# class attribute, so "algolia-hit-link other" wouldn't match it
+_SEARCH_HITS = SoupStrainer('a')
 
-# Rate limiting - adaptive
+class _NotFound:
+    """Falsy, so callers that only test `if result:` treat it like None."""
+    def __bool__(self):
+        return False
+    def __repr__(self):
+        return "NOT_FOUND"
+
+
+# What scrape_game_price / the URL finders return when loaded.com definitely
+# has no page for a title: every URL tried was a plain miss and the site
+# search found nothing. None, by contrast, means the lookup failed (rate
+# limit, timeout, 5xx, page without a price) and says nothing either way.
+NOT_FOUND = _NotFound()
+
+# Rate limiting - adaptive (AIMD): the delay doubles on each 403 and
+# shrinks by a step on each success
+_BASE_DELAY_SECONDS = 1.0   # Start aggressive (1 second)
+_MAX_DELAY_SECONDS = 60.0
+_DELAY_STEP_SECONDS = 0.5
 _last_request_time = 0
-_min_delay_seconds = 1.0  # Start aggressive (1 second)
+_min_delay_seconds = _BASE_DELAY_SECONDS
 _rate_limited = False  # Track if we hit 403 (rate limited)
 _consecutive_errors = 0  # Track consecutive 403s
+_rate_lock = threading.Lock()  # scrapes run on several threads (sync_loaded)
 
 # # Headers -------------------------------------------------------------------
 
@@ -33,53 +95,128 @@ HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
     'Accept-Language': 'en-GB,en-US;q=0.9,en;q=0.8',
-    'Accept-Encoding': 'gzip, deflate, br',
+    # br only when a brotli package is installed to decode it; advertising it
+    # otherwise lets the server send a body requests can't decompress
+    'Accept-Encoding': DEFAULT_ACCEPT_ENCODING,
     'DNT': '1',
     'Connection': 'keep-alive',
     'Cache-Control': 'max-age=0',
 }
 
+# One session for every loaded.com request keeps the TLS connection alive
+# between scrapes (and across the wildcard probes of one scrape), instead of
+# a fresh handshake per requests.get. Sized for the MAX_IN_FLIGHT requests
+# _request lets through at once. Brief 502/503/504 blips are retried here;
+# 403/429 are left to the adaptive rate limiter below.
+_session = requests.Session()
+_session.headers.update(HEADERS)
+_session.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=MAX_IN_FLIGHT,
+    max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504), raise_on_status=False),
+))
+
+# sync_loaded's workers each fan out PROBE_WORKERS probes, so without a cap
+# up to 16 requests could hit loaded.com at once
+_in_flight = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+
+
+def _request(method: str, url: str, **kwargs) -> requests.Response:
+    """_session.request, waiting while MAX_IN_FLIGHT others are under way."""
+    with _in_flight:
+        return _session.request(method, url, timeout=LOADED_TIMEOUT, **kwargs)
+
+
+# # Patterns ------------------------------------------------------------------
+# Compiled once; titles are normalised and prices parsed for every scrape
+
+class _SlugTable(dict):
+    """
+    str.translate table for title slugs: keeps a-z, 0-9 and '-', turns
+    apostrophes, periods and whitespace into '-', and drops everything else.
+    Characters outside the seeded set are classified on first sight and
+    remembered.
+    """
+
+    def __missing__(self, code: int):
+        value = "-" if chr(code).isspace() else None
+        self[code] = value
+        return value
+
+
+_SLUG_TABLE = _SlugTable({ord(c): c for c in "abcdefghijklmnopqrstuvwxyz0123456789-"})
+_SLUG_TABLE.update({ord("'"): "-", ord("."): "-"})
+
+_RE_SEARCH_OTHER = re.compile(r"[^a-z0-9\s]")
+_RE_WHITESPACE = re.compile(r"\s+")
+_RE_DASHES = re.compile(r"-+")
+_RE_PRICE = re.compile(r"[\u00a3$]?\s*([\d.]+)")  # "£25.99" -> 25.99
+_RE_WORD = re.compile(r"\b[a-z0-9]+\b")
+
 
 def _enforce_rate_limit():
-    """Enforce minimum delay between requests (adaptive based on 403 errors)."""
-    global _last_request_time, _min_delay_seconds
-    now = time.time()
-    elapsed = now - _last_request_time
-    if elapsed < _min_delay_seconds:
-        wait_time = _min_delay_seconds - elapsed
+    """
+    Enforce minimum delay between requests (adaptive based on 403 errors).
+    Each caller reserves the next free slot under the lock, so concurrent
+    scrapes start _min_delay_seconds apart on average (each gap is jittered
+    between half and one and a half times that).
+    """
+    global _last_request_time
+    # Jittered gap (same mean), so requests after a backoff don't go out on
+    # an exact beat
+    gap = _min_delay_seconds * random.uniform(0.5, 1.5)
+    with _rate_lock:
+        now = time.monotonic()  # immune to wall-clock adjustments
+        start = max(now, _last_request_time + gap)
+        _last_request_time = start
+    wait_time = start - now
+    if wait_time > 0:
         if wait_time > 0.1:  # Only log if significant wait
             print(f"[Loaded] Rate limit: waiting {wait_time:.1f}s...")
         time.sleep(wait_time)
-    _last_request_time = time.time()
 
 
-def _handle_rate_limit_error():
-    """Called when we get a 403 error. Increases delay for future requests."""
-    global _min_delay_seconds, _consecutive_errors
-    _consecutive_errors += 1
-    # Exponential backoff: 1s -> 5s -> 15s -> 30s
-    if _consecutive_errors == 1:
-        _min_delay_seconds = 5.0
-        print(f"[Loaded] [WARNING] Rate limited (403)! Increasing delay to 5s...")
-    elif _consecutive_errors == 2:
-        _min_delay_seconds = 15.0
-        print(f"[Loaded] [WARNING] Still rate limited. Increasing delay to 15s...")
-    elif _consecutive_errors == 3:
-        _min_delay_seconds = 30.0
-        print(f"[Loaded] [WARNING] Heavily rate limited. Increasing delay to 30s...")
+def _handle_rate_limit_error(retry_after: Optional[str] = None):
+    """
+    Called when we get a 403/429 error. If the server sent Retry-After, the
+    next request is held back that long (up to _MAX_DELAY_SECONDS);
+    otherwise the delay between requests doubles (multiplicative increase,
+    capped at _MAX_DELAY_SECONDS).
+    """
+    global _min_delay_seconds, _consecutive_errors, _last_request_time
+    wait = parse_retry_after(retry_after)
+    # Under the lock so concurrent 403s each double the delay once
+    with _rate_lock:
+        _consecutive_errors += 1
+        if wait is None:
+            _min_delay_seconds = min(_MAX_DELAY_SECONDS, _min_delay_seconds * 2)
+            delay = _min_delay_seconds
+        else:
+            wait = min(wait, _MAX_DELAY_SECONDS)
+            _last_request_time = max(_last_request_time, time.monotonic() + wait)
+    if wait is None:
+        print(f"[Loaded] [WARNING] Rate limited! Increasing delay to {delay:g}s...")
     else:
-        _min_delay_seconds = 60.0
-        print(f"[Loaded] [WARNING] Extremely rate limited. Using 60s delay...")
+        print(f"[Loaded] [WARNING] Rate limited! Server asked to wait {wait:g}s...")
 
 
 def _reset_rate_limit_on_success():
-    """Called on successful request. Resets error counter."""
-    global _consecutive_errors
-    if _consecutive_errors > 0:
-        print(f"[Loaded] [OK] Recovery: rate limit resolved, back to normal")
+    """
+    Called on successful request. Resets the error counter and eases the
+    delay back down a step at a time (additive decrease), so a single 403
+    doesn't slow the rest of the sync for good.
+    """
+    global _min_delay_seconds, _consecutive_errors
+    with _rate_lock:
+        recovered = _consecutive_errors > 0
         _consecutive_errors = 0
+        _min_delay_seconds = max(_BASE_DELAY_SECONDS, _min_delay_seconds - _DELAY_STEP_SECONDS)
+    if recovered:
+        print(f"[Loaded] [OK] Recovery: rate limit resolved, easing delay back down")
 
 
+# The same title is normalised again by the wildcard fallback
+@lru_cache(maxsize=4096)
 def _normalize_game_title(title: str) -> str:
     """
     Convert game title to URL slug.
@@ -91,20 +228,24 @@ def _normalize_game_title(title: str) -> str:
         "Stardew Valley" -> "stardew-valley"
         "L.A. Noire" -> "l-a-noire"
     """
-    title = title.lower()
-    # Replace punctuation with hyphens (not removal)
-    title = re.sub(r"[\'.]", "-", title)  # Replace apostrophes and periods with hyphens
-    title = re.sub(r"[:]", "", title)  # Remove colons (not URLs)
-    title = re.sub(r"[^a-z0-9\s-]", "", title)  # Remove other special characters
-    title = re.sub(r"\s+", "-", title)  # Replace spaces with dashes
-    title = re.sub(r"-+", "-", title)  # Replace multiple dashes with single
+    # One pass: apostrophes, periods and spaces become hyphens, other
+    # punctuation (colons included) is dropped
+    title = title.lower().translate(_SLUG_TABLE)
+    title = _RE_DASHES.sub("-", title)  # Replace multiple dashes with single
     title = title.strip("-")  # Remove leading/trailing dashes
     return title
 
 
 def _similarity(a: str, b: str) -> float:
     """Calculate similarity between two strings (0.0 to 1.0)."""
-    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
+    return _similarity_lower(a.lower(), b.lower())
+
+
+@lru_cache(maxsize=4096)
+def _similarity_lower(a: str, b: str) -> float:
+    if _fuzz_ratio is not None:
+        return _fuzz_ratio(a, b) / 100.0
+    return SequenceMatcher(None, a, b).ratio()
 
 
 def _to_ascii(text: str) -> str:
@@ -127,7 +268,7 @@ def _extract_prices_from_html(html: str) -> tuple:
     
     Returns: (current_price, regular_price, title, discount_pct)
     """
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = BeautifulSoup(html, _BS4_PARSER)
     
     # Try to find the game title from page
     title = None
@@ -154,17 +295,14 @@ def _extract_prices_from_html(html: str) -> tuple:
     page_text = soup.get_text()
     page_text_lower = page_text.lower()
     
-    # Check for explicit "Sold Out" or "Coming Soon" text on the page
-    if 'sold out' in page_text_lower or 'coming soon' in page_text_lower:
-        # Look for the badge/status element
-        for elem in soup.find_all(['div', 'span']):
-            elem_text = elem.get_text(strip=True).lower()
-            if 'sold out' in elem_text:
-                print(f"[Loaded] [INFO] Game is SOLD OUT - not returning prices")
-                return None, None, title, 0
-            elif 'coming soon' in elem_text:
-                print(f"[Loaded] [INFO] Game is COMING SOON - not returning prices")
-                return None, None, title, 0
+    # Check for explicit "Sold Out" or "Coming Soon" text on the page (the
+    # page text already says which; no need to walk every div/span for it)
+    if 'sold out' in page_text_lower:
+        print(f"[Loaded] [INFO] Game is SOLD OUT - not returning prices")
+        return None, None, title, 0
+    if 'coming soon' in page_text_lower:
+        print(f"[Loaded] [INFO] Game is COMING SOON - not returning prices")
+        return None, None, title, 0
     
     # Also check if the page shows "not available" or "unavailable"
     if 'unavailable' in page_text_lower or 'not available' in page_text_lower:
@@ -182,7 +320,7 @@ def _extract_prices_from_html(html: str) -> tuple:
         if price_span:
             price_text = price_span.get_text(strip=True)
             # Extract number from "£25.99" format
-            match = re.search(r'[\u00a3$]?\s*([\d.]+)', price_text)
+            match = _RE_PRICE.search(price_text)
             if match:
                 try:
                     current_price = float(match.group(1))
@@ -197,7 +335,7 @@ def _extract_prices_from_html(html: str) -> tuple:
         if price_span:
             price_text = price_span.get_text(strip=True)
             # Extract number from "£64.99" format
-            match = re.search(r'[\u00a3$]?\s*([\d.]+)', price_text)
+            match = _RE_PRICE.search(price_text)
             if match:
                 try:
                     regular_price = float(match.group(1))
@@ -231,7 +369,8 @@ def _extract_prices_from_html(html: str) -> tuple:
     return current_price, regular_price, title, discount_pct
 
 
-def scrape_game_price(game_title: str, platform: str = "pc", drm: str = "steam") -> Optional[Dict]:
+def scrape_game_price(game_title: str, platform: str = "pc", drm: str = "steam",
+                      known_url: str = None, search: bool = True) -> Optional[Dict]:
     """
     Scrape game price from Loaded.com using BeautifulSoup.
     
@@ -244,36 +383,51 @@ def scrape_game_price(game_title: str, platform: str = "pc", drm: str = "steam")
         game_title: Game name (can be approximate)
         platform: Platform (default "pc")
         drm: DRM type (default "steam")
+        known_url: Page this game was found on last time, if any; tried
+                   first so a title that needed the wildcard or search
+                   fallback doesn't need it again
+        search: On a 404, go on to the wildcard patterns and site search
+                (False for titles a recent search already failed to find)
     
     Returns:
-        Dict with price info or None if not found
+        Dict with price info, NOT_FOUND if loaded.com has no page for the
+        game, or None if it couldn't be scraped this time
     """
     
     _enforce_rate_limit()
     
     normalized_title = _normalize_game_title(game_title)
-    url = f"{LOADED_BASE}/{normalized_title}-{platform}-{drm}"
+    guessed_url = f"{LOADED_BASE}/{normalized_title}-{platform}-{drm}"
+    url = known_url or guessed_url
     
     print(f"[Loaded] BS4: {url}")
     
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=LOADED_TIMEOUT)
+        resp = _request("GET", url)
+        
+        # Known page has gone: look the title up from scratch
+        if resp.status_code == 404 and url != guessed_url:
+            print(f"[Loaded] Known page gone, trying {guessed_url}")
+            resp = _request("GET", guessed_url)
+        
+        if resp.status_code == 404 and not search:
+            print(f"[Loaded] 404, not found on a recent search either")
+            return NOT_FOUND
         
         # 404: Try wildcard patterns first, then search
         if resp.status_code == 404:
             print(f"[Loaded] 404, trying wildcard patterns...")
             wildcard_url = search_loaded_with_wildcards(game_title, platform, drm)
-            if wildcard_url:
-                resp = requests.get(wildcard_url, headers=HEADERS, timeout=LOADED_TIMEOUT)
-                if resp.status_code != 200:
-                    return None
-            else:
+            if not wildcard_url:
+                return wildcard_url  # NOT_FOUND, or None if the search failed
+            resp = _request("GET", wildcard_url)
+            if resp.status_code != 200:
                 return None
         
-        # 403: Rate limited - increase delays
-        if resp.status_code == 403:
-            print(f"[Loaded] 403 Forbidden - IP rate limited")
-            _handle_rate_limit_error()
+        # 403/429: Rate limited - wait as told, or increase delays
+        if resp.status_code in (403, 429):
+            print(f"[Loaded] {resp.status_code} - IP rate limited")
+            _handle_rate_limit_error(resp.headers.get("Retry-After"))
             return None
         
         # Other errors
@@ -282,7 +436,10 @@ def scrape_game_price(game_title: str, platform: str = "pc", drm: str = "steam")
             return None
         
         resp.raise_for_status()
-        html = resp.text
+        # loaded.com serves UTF-8; decode it directly rather than via
+        # resp.text, which falls back to ISO-8859-1 (or charset sniffing over
+        # the whole page) when the response doesn't name a charset
+        html = resp.content.decode("utf-8", errors="replace")
         
         # Extract prices and title
         current_price, regular_price, page_title, discount_pct = _extract_prices_from_html(html)
@@ -343,40 +500,105 @@ def search_loaded_with_wildcards(game_title: str, platform: str = "pc", drm: str
         drm: DRM type (default "steam")
     
     Returns:
-        URL string or None if not found
+        URL string, NOT_FOUND if every pattern and the site search came back
+        empty, or None if any of them couldn't be checked
     """
     
     normalized_title = _normalize_game_title(game_title)
     
     # Try common patterns
-    patterns = [
-        f"{normalized_title}-{platform}-{drm}",  # Exact
-        f"{normalized_title}-2024-{platform}-{drm}",  # With current year
-        f"{normalized_title}-2023-{platform}-{drm}",  # Previous year
-        f"{normalized_title}-2022-{platform}-{drm}",  # 2 years ago
-        f"{normalized_title}-deluxe-{platform}-{drm}",  # Deluxe edition
-        f"{normalized_title}-ultimate-{platform}-{drm}",  # Ultimate edition
-        f"{normalized_title}-standard-{platform}-{drm}",  # Standard edition
-        f"{normalized_title}-{platform}-{drm}-cd-key",  # CD key variant
-    ]
+    patterns = [f"{normalized_title}{suffix}-{platform}-{drm}" for suffix in _PATTERN_SUFFIXES]
+    patterns.append(f"{normalized_title}-{platform}-{drm}-cd-key")  # CD key variant
     
     print(f"[Loaded] Trying wildcard patterns for: {game_title}")
     
-    for pattern in patterns:
-        url = f"{LOADED_BASE}/{pattern}"
+    def probe(url: str) -> Optional[int]:
+        """The URL's status code, or None if the request failed."""
         try:
-            resp = requests.get(url, headers=HEADERS, timeout=LOADED_TIMEOUT, allow_redirects=False)
-            if resp.status_code == 200:
-                # Verify URL contains -pc- (skip Xbox, PSN, etc.)
-                if '-pc-' in url:
-                    print(f"[Loaded] Wildcard match found: {url}")
-                    return url
-        except:
-            pass
+            # Only the status matters here, so skip the body; the caller GETs
+            # the page that matches
+            resp = _request("HEAD", url, allow_redirects=False)
+            if resp.status_code == 405:  # HEAD not allowed, ask properly
+                resp = _request("GET", url, allow_redirects=False)
+            return resp.status_code
+        except requests.RequestException:
+            return None
+    
+    # Verify URL contains -pc- (skip Xbox, PSN, etc.)
+    urls = [f"{LOADED_BASE}/{pattern}" for pattern in patterns if '-pc-' in pattern]
+    
+    # The probes go out together (as one rate-limited request, still within
+    # MAX_IN_FLIGHT) rather than one round trip after another; the earliest
+    # pattern that exists still wins, and probes not yet started are
+    # cancelled once it's known
+    _enforce_rate_limit()
+    inconclusive = False  # a probe failed or was refused, rather than missing
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as pool:
+        futures = [(url, pool.submit(probe, url)) for url in urls]
+        for url, future in futures:
+            status = future.result()
+            if status == 200:
+                for _, pending in futures:
+                    pending.cancel()
+                print(f"[Loaded] Wildcard match found: {url}")
+                return url
+            if status is None or status in (403, 429) or status >= 500:
+                inconclusive = True
     
     # If no pattern matched, fall back to search
     print(f"[Loaded] No wildcard match, falling back to search...")
-    return search_loaded_for_game(game_title)
+    found = search_loaded_for_game(game_title)
+    if found is NOT_FOUND and inconclusive:
+        return None
+    return found
+
+
+# Headless Chrome for search_loaded_for_game, started on first use and kept
+# until close_search_browser(): Chrome takes seconds to launch, so one per
+# search used to dominate the search time. Only touch it with _driver_lock held.
+_driver = None
+_driver_lock = threading.Lock()
+
+
+def _get_driver():
+    """The shared Chrome driver, launched if it isn't running yet."""
+    global _driver
+    if _driver is None:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        
+        # Configure headless browser
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+        
+        _driver = webdriver.Chrome(options=chrome_options)
+    return _driver
+
+
+# Fallback for the CLI only: a forked sync process (the web UI's) leaves via
+# os._exit and never runs atexit hooks, so callers must close_search_browser()
+@atexit.register
+def _quit_driver():
+    """Shut the shared Chrome down (at exit, or after it has failed)."""
+    global _driver
+    if _driver is not None:
+        try:
+            _driver.quit()
+        except Exception:
+            pass
+        _driver = None
+
+
+def close_search_browser() -> None:
+    """
+    Quit the shared Chrome (and its chromedriver) once a batch of scrapes
+    is done. The next search starts a new one.
+    """
+    with _driver_lock:
+        _quit_driver()
 
 
 def search_loaded_for_game(game_title: str) -> Optional[str]:
@@ -395,14 +617,15 @@ def search_loaded_for_game(game_title: str) -> Optional[str]:
         game_title: Game name to search for
     
     Returns:
-        URL string or None if not found
+        URL string, NOT_FOUND if the search has no matching results, or None
+        if it couldn't be run
     """
     
     _enforce_rate_limit()
     
     # Convert title: replace special characters with spaces, then URL encode
-    search_term = re.sub(r'[^a-z0-9\s]', ' ', game_title.lower())
-    search_term = re.sub(r'\s+', ' ', search_term).strip()
+    search_term = _RE_SEARCH_OTHER.sub(' ', game_title.lower())
+    search_term = _RE_WHITESPACE.sub(' ', search_term).strip()
     search_term = search_term.replace(' ', '%20')
     
     search_url = f"{LOADED_BASE}/#q={search_term}"
@@ -413,22 +636,16 @@ def search_loaded_for_game(game_title: str) -> Optional[str]:
     try:
         # Try Selenium first (if available)
         try:
-            from selenium import webdriver
+            from selenium.common.exceptions import TimeoutException, WebDriverException
             from selenium.webdriver.common.by import By
             from selenium.webdriver.support.ui import WebDriverWait
             from selenium.webdriver.support import expected_conditions as EC
-            from selenium.webdriver.chrome.options import Options
-            
-            # Configure headless browser
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-            
-            driver = webdriver.Chrome(options=chrome_options)
             
+            # One browser, one search at a time
+            _driver_lock.acquire()
             try:
+                driver = _get_driver()
+                
                 # Load the search page
                 driver.get(search_url)
                 
@@ -440,18 +657,18 @@ def search_loaded_for_game(game_title: str) -> Optional[str]:
                 html = driver.page_source
                 
                 # Parse with BeautifulSoup
-                soup = BeautifulSoup(html, 'html.parser')
+                soup = BeautifulSoup(html, _BS4_PARSER, parse_only=_SEARCH_HITS)
                 
                 # Find algolia search results
                 product_links = soup.find_all('a', class_='algolia-hit-link')
                 
                 if not product_links:
                     print(f"[Loaded] Search found no results")
-                    return None
+                    return NOT_FOUND
                 
                 # Go through each link and verify it matches our search
                 search_terms_lower = game_title.lower()
-                title_words = re.findall(r'\b[a-z0-9]+\b', search_terms_lower)
+                title_words = _RE_WORD.findall(search_terms_lower)
                 
                 # Separate WW and regional versions
                 ww_candidates = []
@@ -498,20 +715,28 @@ def search_loaded_for_game(game_title: str) -> Optional[str]:
                     return result_url
                 
                 print(f"[Loaded] Search found no matching PC results")
-                return None
+                return NOT_FOUND
             
+            except TimeoutException:
+                # No result links rendered: the search has no hits
+                print(f"[Loaded] Search found no results")
+                return NOT_FOUND
+            except WebDriverException:
+                # May have left the browser unusable, so start a fresh one next time
+                _quit_driver()
+                raise
             finally:
-                driver.quit()
+                _driver_lock.release()
         
         except ImportError:
             # Selenium not available, fall back to requests (won't work for JS-rendered content)
             print(f"[Loaded] [WARNING] Selenium not installed - search won't work (install: pip install selenium)")
             print(f"[Loaded] [WARNING] Falling back to basic requests (will likely fail)")
             
-            resp = requests.get(search_url, headers=HEADERS, timeout=LOADED_TIMEOUT)
+            resp = _request("GET", search_url)
             resp.raise_for_status()
             
-            soup = BeautifulSoup(resp.text, 'html.parser')
+            soup = BeautifulSoup(resp.text, _BS4_PARSER, parse_only=_SEARCH_HITS)
             product_links = soup.find_all('a', class_='algolia-hit-link')
             
             if not product_links:
@@ -23,16 +23,48 @@ How to find your Steam ID:
 """
 
 import requests
-import time
-from src.database import upsert_game, get_all_games, upsert_price
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from ratelimit import RateLimiter, parse_retry_after
+from database import upsert_games_bulk, get_all_games, upsert_prices_bulk, transaction
+
+# orjson parses the appdetails payloads faster than the stdlib
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
 
 
 # Steam endpoints
 WISHLIST_URL = "https://api.steampowered.com/IWishlistService/GetWishlist/v1"
 APP_DETAILS_URL = "https://store.steampowered.com/api/appdetails"
 
-# Steam rate limits are generous but real. 1 request/sec is safe.
-RATE_LIMIT_DELAY = 1.0  # seconds between app-detail fetches
+# Steam throttles appdetails to roughly 200 requests per 5 minutes. MAX_RATE
+# is well above that, so a large wishlist will hit 429s: on one, every worker
+# pauses (Retry-After, or THROTTLE_PAUSE growing per attempt) and the app is
+# fetched again rather than skipped.
+MAX_RATE = 4           # app-detail fetches started per second, across all workers
+MAX_WORKERS = 4        # app-detail fetches in flight at once
+THROTTLE_PAUSE = 60.0  # seconds to back off on a 429 without Retry-After
+MAX_ATTEMPTS = 5       # tries per app before it's left for the next sync
+
+# One session for every Steam call keeps the TLS connection alive between
+# requests (requests already asks for gzip/deflate responses by default).
+# The pool is sized so every worker gets its own connection, and transient
+# 5xx responses are retried with backoff. 429s are left to sync_wishlist,
+# which pauses far longer than urllib3's backoff would.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=2,  # api.steampowered.com + store.steampowered.com
+    pool_maxsize=MAX_WORKERS,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504)),
+))
+
+_FAILED = object()  # fetch_politely's result for an app that couldn't be fetched
+
+
+_limiter = RateLimiter(MAX_RATE)
 
 
 def fetch_wishlist_app_ids(steam_id: str, api_key: str) -> list[int]:
@@ -51,12 +83,12 @@ def fetch_wishlist_app_ids(steam_id: str, api_key: str) -> list[int]:
     }
 
     print("[Steam] Fetching wishlist app IDs...")
-    resp = requests.get(WISHLIST_URL, params=params, timeout=15)
+    resp = _session.get(WISHLIST_URL, params=params, timeout=15)
 
     # Raise an exception for HTTP errors (4xx, 5xx)
     resp.raise_for_status()
 
-    data = resp.json()
+    data = _loads(resp.content)
 
     # The response nests under response items appid
     items = data.get("response", {}).get("items", [])
@@ -87,10 +119,10 @@ def fetch_app_details(app_id: int) -> dict | None:
         "l": "en",
     }
 
-    resp = requests.get(APP_DETAILS_URL, params=params, timeout=15)
+    resp = _session.get(APP_DETAILS_URL, params=params, timeout=15)
     resp.raise_for_status()
 
-    data = resp.json()
+    data = _loads(resp.content)
     app_data = data.get(str(app_id), {})
 
     # The API returns {"success": false} for invalid/removed apps
@@ -144,7 +176,9 @@ def sync_wishlist(steam_id: str, api_key: str) -> list[int]:
     Returns the list of app_ids that were successfully saved.
 
     Design note: we fetch all IDs first (fast, one request), then
-    look up details one-by-one with a delay (slow but polite).
+    look up details on MAX_WORKERS threads, with request starts spaced
+    to MAX_RATE per second between them (polite, but not strictly
+    one-at-a-time). DB writes stay on this thread.
     """
     app_ids = fetch_wishlist_app_ids(steam_id, api_key)
     if not app_ids:
@@ -156,39 +190,65 @@ def sync_wishlist(steam_id: str, api_key: str) -> list[int]:
     print(f"[Steam] {len(existing)} already in DB, fetching details for {len(new_ids)} new games...")
 
     saved = list(existing)  # start with already-known games
-
-    for i, app_id in enumerate(new_ids, 1):
-        print(f"[Steam] ({i}/{len(new_ids)}) Fetching details for app {app_id}...", end=" ")
-
-        details = fetch_app_details(app_id)
-
-        if details is None:
-            print("Skipped (not a game or unavailable)")
-        else:
-            upsert_game(
-                app_id=app_id,
-                title=details["name"],
-                steam_url=details["steam_url"],
-                header_image=details["header_image"],
-            )
+    game_records = []       # new games and their Steam prices, written in
+    price_records = []      # one transaction at the end
+
+    def fetch_politely(app_id: int):
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            # Be polite to Steam's servers
+            _limiter.wait()
+            try:
+                return fetch_app_details(app_id)
+            except requests.HTTPError as e:
+                if e.response is not None and e.response.status_code == 429:
+                    # Throttled: hold back every worker, then ask again
+                    wait = parse_retry_after(e.response.headers.get("Retry-After")) or THROTTLE_PAUSE * attempt
+                    print(f"[Steam] Throttled by Steam, pausing {wait:.0f}s (app {app_id})")
+                    _limiter.pause(wait)
+                    continue
+                error = e
+            except requests.RequestException as e:
+                error = e
+            print(f"[Steam] Error fetching details for app {app_id} (try {attempt}/{MAX_ATTEMPTS}): {error}")
+        # One app failing skips that app, not the rest of the wishlist
+        return _FAILED
+
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            # map() yields in wishlist order as each fetch completes
+            results = pool.map(fetch_politely, new_ids)
+
+            for i, (app_id, details) in enumerate(zip(new_ids, results), 1):
+                print(f"[Steam] ({i}/{len(new_ids)}) Fetched details for app {app_id}...", end=" ")
+
+                if details is _FAILED:
+                    # Not saved, so it's still "new" and fetched next sync
+                    print("Failed (will retry next sync)")
+                    continue
+                if details is None:
+                    print("Skipped (not a game or unavailable)")
+                    continue
+
+                game_records.append((
+                    app_id, details["name"], details["steam_url"], details["header_image"],
+                ))
             
-            # Save Steam's price as a store entry
-            if details["price_gbp"] is not None:
-                upsert_price(
-                    app_id=app_id,
-                    store="Steam",
-                    price_current=details["price_gbp"],
-                    price_regular=details["price_original_gbp"] or details["price_gbp"],
-                    currency="GBP",
-                    discount_pct=0,  # Will be calculated by discount logic later
-                    url=details["steam_url"],
-                )
+                # Save Steam's price as a store entry (discount is calculated by discount logic later)
+                if details["price_gbp"] is not None:
+                    price_records.append((
+                        app_id, "Steam", details["price_gbp"],
+                        details["price_original_gbp"] or details["price_gbp"],
+                        "GBP", 0, details["steam_url"], None,
+                    ))
             
-            saved.append(app_id)
-            print(f"{details['name']}")
-
-        # Be polite to Steam's servers
-        time.sleep(RATE_LIMIT_DELAY)
+                saved.append(app_id)
+                print(f"{details['name']}")
+    finally:
+        # Written after the fetches so the write lock isn't held during
+        # network I/O, and even if they stop early, so the work isn't lost
+        with transaction():
+            upsert_games_bulk(game_records)
+            upsert_prices_bulk(price_records)
 
     print(f"\n[Steam] Sync complete. {len(saved)} games in database.")
     return saved
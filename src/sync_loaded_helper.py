@@ -5,9 +5,19 @@ Syncs prices from loaded.com using BeautifulSoup scraper.
 Separate from itad.py to keep ITAD API module unchanged.
 """
 
-import time
-from loaded_bs4 import scrape_game_price
-from database import get_all_games, upsert_price
+from concurrent.futures import ThreadPoolExecutor
+from loaded_bs4 import NOT_FOUND, close_search_browser, scrape_game_price
+from database import (
+    get_all_games, get_loaded_misses, get_store_urls, update_loaded_misses, upsert_prices_bulk,
+)
+
+# Scrapes in flight at once. loaded_bs4 still spaces request starts by its
+# (adaptive) minimum delay; this lets one page download while the next waits
+MAX_WORKERS = 4
+
+# How long a game a full search couldn't find skips the wildcard probes and
+# site search (its guessed URL is still checked every sync)
+MISS_TTL_DAYS = 1
 
 
 def sync_loaded(steam_id_to_title: dict = None) -> None:
@@ -16,6 +26,9 @@ def sync_loaded(steam_id_to_title: dict = None) -> None:
     
     loaded.com is a UK game key reseller with good prices.
     We scrape the prices using Selenium and save them to the database.
+    Scrapes overlap on a small thread pool; the prices are written in one
+    transaction at the end. Games a full search missed within the last
+    MISS_TTL_DAYS only have their guessed URL checked.
     
     Args:
         steam_id_to_title: Optional dict of {app_id: game_title} to sync
@@ -33,31 +46,52 @@ def sync_loaded(steam_id_to_title: dict = None) -> None:
     
     print(f"\n[Loaded] Scraping prices for {len(steam_id_to_title)} games...")
     
-    prices_saved = 0
+    # Pages found on earlier syncs are tried first, skipping the URL guessing
+    known_urls = get_store_urls("Loaded")
+    recent_misses = get_loaded_misses(MISS_TTL_DAYS)
+    
+    price_records = []
     not_found = []
+    found_ids = []
+    missed_ids = []  # fully searched and not found
     
-    for i, (app_id, title) in enumerate(steam_id_to_title.items(), 1):
-        try:
-            result = scrape_game_price(title, platform="pc", drm="steam")
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            futures = [
+                (app_id, title, pool.submit(
+                    scrape_game_price, title, platform="pc", drm="steam", known_url=known_urls.get(app_id),
+                    search=app_id not in recent_misses,
+                ))
+                for app_id, title in steam_id_to_title.items()
+            ]
+            for app_id, title, future in futures:
+                try:
+                    result = future.result()
+                
+                    if result:
+                        price_records.append((
+                            app_id, "Loaded", result["price"], result["regular_price"],
+                            result["currency"], result["discount_pct"], result["url"], None,
+                        ))
+                        found_ids.append(app_id)
+                    else:
+                        not_found.append(title)
+                        # Rate limits, timeouts and the like aren't misses:
+                        # those games are searched again next sync
+                        if result is NOT_FOUND and app_id not in recent_misses:
+                            missed_ids.append(app_id)
             
-            if result:
-                upsert_price(
-                    app_id=app_id,
-                    store="Loaded",
-                    price_current=result["price"],
-                    price_regular=result["regular_price"],
-                    currency=result["currency"],
-                    discount_pct=result["discount_pct"],
-                    url=result["url"],
-                )
-                prices_saved += 1
-            else:
-                not_found.append(title)
-        
-        except Exception as e:
-            print(f"[Loaded] Error processing {title}: {e}")
-            not_found.append(title)
+                except Exception as e:
+                    print(f"[Loaded] Error processing {title}: {e}")
+                    not_found.append(title)
+    finally:
+        # Don't leave Chrome running once the sync is done: the web UI's sync
+        # process exits without running atexit hooks
+        close_search_browser()
     
+    upsert_prices_bulk(price_records)
+    update_loaded_misses(missed_ids, found_ids)
+    prices_saved = len(price_records)
     print(f"[Loaded] ✓ Saved {prices_saved}/{len(steam_id_to_title)} prices")
     
     if not_found and len(not_found) <= 10:
@@ -0,0 +1,58 @@
+"""
+test_app.py
+-----------
+Tests for the Flask JSON API, run against a throwaway database.
+
+    python -m unittest discover tests
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+
+import database
+import app as web
+
+
+class ExcludeStoresTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._old_path = database.DB_PATH
+        database.DB_PATH = Path(self._tmp.name) / "test.db"
+        database.init_db()
+
+        database.upsert_game(1, "Alpha Game")
+        database.upsert_prices_bulk([
+            (1, "Steam", 20.0, 20.0, "GBP", 0, "s", None),
+            (1, "GOG", 15.0, 20.0, "GBP", 25, "g", None),
+            (1, "Fanatical", 18.0, 20.0, "GBP", 10, "f", None),
+        ])
+        self.client = web.app.test_client()
+
+    def tearDown(self):
+        database.close_connection()
+        database.DB_PATH = self._old_path
+        self._tmp.cleanup()
+
+    def best_store(self, query: str) -> str:
+        resp = self.client.get(f"/api/games/best?exclude={query}")
+        self.assertEqual(resp.status_code, 200)
+        return resp.get_json()["1"]["store"]
+
+    def test_exclude_one_store(self):
+        self.assertEqual(self.best_store("GOG"), "Fanatical")
+
+    def test_exclude_list_with_spaces_after_commas(self):
+        self.assertEqual(self.best_store("GOG, Fanatical"), "Steam")
+
+    def test_exclude_ignores_empty_entries(self):
+        self.assertEqual(self.best_store("GOG,, "), "Fanatical")
+
+
+if __name__ == "__main__":
+    unittest.main()